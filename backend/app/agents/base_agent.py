@@ -1,17 +1,24 @@
 from __future__ import annotations
 
-from pathlib import Path
 from typing import Any
 
 from app.utils.llm_client import LLMClient
+from app.utils.prompt_registry import get_prompt_registry
 
 
 
 class BaseAgent:
+    # Label for per-agent LLM call metrics
+    agent_name = "agent"
+
     def __init__(self, llm: LLMClient) -> None:
         self.llm = llm
-        self.prompts_dir = Path(__file__).resolve().parents[1] / "prompts"
+        self.prompts = get_prompt_registry()
+        self.prompts_dir = self.prompts.prompts_dir
 
     def _read_prompt(self, filename: str) -> str:
-        path = self.prompts_dir / filename
-        return path.read_text(encoding="utf-8")
+        return self.prompts.template(filename)
+
+    def _prompt_prefix(self, filename: str) -> str:
+        """Template plus separator, rendered once; agents append their inputs to it."""
+        return self.prompts.prefix(filename)
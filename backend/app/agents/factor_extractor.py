@@ -11,11 +11,13 @@ from app.schemas.factor import Factor, DomainEnum
 
 
 class FactorExtractorAgent(BaseAgent):
+    agent_name = "extractor"
+
     async def extract_factors(self, context: ReasoningContext) -> List[Factor]:
         prompt_template = self._read_prompt("factor_prompt.txt")
         prompt = prompt_template.format(context_json=context.json())
 
-        content = await self.llm.acompletion(prompt)
+        content = await self.llm.acompletion(prompt, agent=self.agent_name)
 
         print("\n" + "=" * 60)
         print("RAW LLM OUTPUT (FACTOR EXTRACTOR):")
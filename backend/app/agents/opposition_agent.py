@@ -1,29 +1,56 @@
 from __future__ import annotations
 
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
 from fastapi import HTTPException
 
 from app.agents.base_agent import BaseAgent
 from app.schemas.factor import Factor
-from app.schemas.debate import SupportArguments, OppositionCounterArguments
+from app.schemas.debate import CounterArgument, SupportArguments, OppositionCounterArguments
 
 
 class OppositionAgent(BaseAgent):
+    agent_name = "opposition"
+
     async def generate_counters(
-        self, factor: Factor, support: SupportArguments
+        self,
+        factor: Factor,
+        support: SupportArguments,
+        on_counter: Optional[Callable[[CounterArgument], Awaitable[None]]] = None,
+    ) -> OppositionCounterArguments:
+        """`on_counter` is awaited for each counter-argument as soon as it validates (when LLM_STREAMING is on)."""
+        return await self._counters("opposition_prompt.txt", factor, support, on_counter)
+
+    async def generate_claim_counters(
+        self,
+        factor: Factor,
+        support: SupportArguments,
+        on_counter: Optional[Callable[[CounterArgument], Awaitable[None]]] = None,
     ) -> OppositionCounterArguments:
-        prompt_template = self._read_prompt("opposition_prompt.txt")
+        """Counters for a subset of the support claims (pipelined debates), 1-2 per claim."""
+        return await self._counters("opposition_claim_prompt.txt", factor, support, on_counter)
 
+    async def _counters(
+        self,
+        prompt_file: str,
+        factor: Factor,
+        support: SupportArguments,
+        on_counter: Optional[Callable[[CounterArgument], Awaitable[None]]],
+    ) -> OppositionCounterArguments:
         prompt = (
-            f"{prompt_template}\n\n"
+            f"{self._prompt_prefix(prompt_file)}"
             f"Factor:\n{factor.model_dump_json()}\n\n"
             f"Support Output:\n{support.model_dump_json()}"
         )
 
-        content = await self.llm.acompletion(prompt)
+        if self.llm.streaming:
+            return await self._stream_counters(prompt, on_counter)
+
+        content = await self.llm.acompletion(prompt, agent=self.agent_name)
 
         try:
             data = self.llm.parse_json(content)
-            return OppositionCounterArguments(**data)
+            opposition = OppositionCounterArguments(**data)
         except Exception as e:
             raise HTTPException(
                 status_code=422,
@@ -33,3 +60,56 @@ class OppositionAgent(BaseAgent):
                     "llm_output": content,
                 },
             )
+        if on_counter is not None:
+            for counter in opposition.counter_arguments:
+                await on_counter(counter)
+        return opposition
+
+    async def _stream_counters(
+        self, prompt: str, on_counter: Optional[Callable[[CounterArgument], Awaitable[None]]]
+    ) -> OppositionCounterArguments:
+        counters: List[CounterArgument] = []
+
+        async def on_item(raw: Dict[str, Any]) -> None:
+            counter = CounterArgument(**raw)
+            counters.append(counter)
+            if on_counter is not None:
+                await on_counter(counter)
+
+        try:
+            await self.llm.astream_items(prompt, "counter_arguments", on_item, agent=self.agent_name)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=422,
+                detail={"error": "Counter-arguments parsing failed", "reason": str(e)},
+            )
+        return OppositionCounterArguments(counter_arguments=counters)
+
+    async def generate_counters_batch(
+        self, debates: List[Tuple[Factor, SupportArguments]]
+    ) -> Dict[str, OppositionCounterArguments]:
+        """One call for all factors; only factors whose output validates are returned."""
+        items_json = "[" + ",".join(
+            f'{{"factor":{factor.model_dump_json()},"support":{support.model_dump_json()}}}'
+            for factor, support in debates
+        ) + "]"
+        prompt = (
+            f"{self._prompt_prefix('opposition_batch_prompt.txt')}"
+            f"Factors with Support Output:\n{items_json}"
+        )
+
+        content = await self.llm.acompletion(prompt, agent=self.agent_name)
+
+        try:
+            data = self.llm.parse_json(content)
+        except Exception as e:
+            print(f"[OPPOSITION] Batched output unparseable, falling back per factor: {e}")
+            return {}
+
+        results: Dict[str, OppositionCounterArguments] = {}
+        for factor, _ in debates:
+            try:
+                results[factor.factor_id] = OppositionCounterArguments(**data[factor.factor_id])
+            except Exception as e:
+                print(f"[OPPOSITION] Batched output invalid for {factor.factor_id}: {e}")
+        return results
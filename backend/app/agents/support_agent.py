@@ -1,28 +1,41 @@
 from __future__ import annotations
 
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
 from fastapi import HTTPException
 
 from app.agents.base_agent import BaseAgent
 from app.schemas.context import ReasoningContext
 from app.schemas.factor import Factor
-from app.schemas.debate import SupportArguments
+from app.schemas.debate import SupportArgument, SupportArguments
 
 
 class SupportAgent(BaseAgent):
-    async def generate_support(self, factor: Factor, context: ReasoningContext) -> SupportArguments:
-        prompt_template = self._read_prompt("support_prompt.txt")
+    agent_name = "support"
 
-        prompt = (
-            f"{prompt_template}\n\n"
-            f"Context:\n{context.model_dump_json()}\n\n"
-            f"Factor:\n{factor.model_dump_json()}"
-        )
+    def context_prefix(self, context: ReasoningContext) -> str:
+        """Template + context: identical for every factor sharing this context view, so the
+        backend may serve it from a context cache. The factor follows it in the prompt."""
+        return f"{self._prompt_prefix('support_prompt.txt')}Context:\n{context.model_dump_json()}\n\n"
+
+    async def generate_support(
+        self,
+        factor: Factor,
+        context: ReasoningContext,
+        on_argument: Optional[Callable[[SupportArgument], Awaitable[None]]] = None,
+    ) -> SupportArguments:
+        """`on_argument` is awaited for each argument as soon as it validates (when LLM_STREAMING is on)."""
+        prefix = self.context_prefix(context)
+        prompt = f"{prefix}Factor:\n{factor.model_dump_json()}"
+
+        if self.llm.streaming:
+            return await self._stream_support(prompt, prefix, on_argument)
 
-        content = await self.llm.acompletion(prompt)
+        content = await self.llm.acompletion(prompt, agent=self.agent_name, cache_prefix=prefix)
 
         try:
             data = self.llm.parse_json(content)
-            return SupportArguments(**data)
+            support = SupportArguments(**data)
         except Exception as e:
             raise HTTPException(
                 status_code=422,
@@ -32,3 +45,59 @@ class SupportAgent(BaseAgent):
                     "llm_output": content,
                 },
             )
+        if on_argument is not None:
+            for argument in support.support_arguments:
+                await on_argument(argument)
+        return support
+
+    async def _stream_support(
+        self,
+        prompt: str,
+        prefix: str,
+        on_argument: Optional[Callable[[SupportArgument], Awaitable[None]]],
+    ) -> SupportArguments:
+        arguments: List[SupportArgument] = []
+
+        async def on_item(raw: Dict[str, Any]) -> None:
+            argument = SupportArgument(**raw)
+            arguments.append(argument)
+            if on_argument is not None:
+                await on_argument(argument)
+
+        try:
+            await self.llm.astream_items(
+                prompt, "support_arguments", on_item, agent=self.agent_name, cache_prefix=prefix
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=422,
+                detail={"error": "Support arguments parsing failed", "reason": str(e)},
+            )
+        return SupportArguments(support_arguments=arguments)
+
+    async def generate_support_batch(
+        self, factors: List[Factor], context: ReasoningContext
+    ) -> Dict[str, SupportArguments]:
+        """One call for all factors; only factors whose output validates are returned."""
+        factors_json = "[" + ",".join(f.model_dump_json() for f in factors) + "]"
+        prompt = (
+            f"{self._prompt_prefix('support_batch_prompt.txt')}"
+            f"Context:\n{context.model_dump_json()}\n\n"
+            f"Factors:\n{factors_json}"
+        )
+
+        content = await self.llm.acompletion(prompt, agent=self.agent_name)
+
+        try:
+            data = self.llm.parse_json(content)
+        except Exception as e:
+            print(f"[SUPPORT] Batched output unparseable, falling back per factor: {e}")
+            return {}
+
+        results: Dict[str, SupportArguments] = {}
+        for factor in factors:
+            try:
+                results[factor.factor_id] = SupportArguments(**data[factor.factor_id])
+            except Exception as e:
+                print(f"[SUPPORT] Batched output invalid for {factor.factor_id}: {e}")
+        return results
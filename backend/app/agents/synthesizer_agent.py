@@ -9,20 +9,20 @@ from app.schemas.final_report import FinalReport
 
 
 class SynthesizerAgent(BaseAgent):
+    agent_name = "synthesizer"
+
     async def generate_report(
         self, context: ReasoningContext, debates: list[DebateTrace]
     ) -> FinalReport:
-        prompt_template = self._read_prompt("synthesis_prompt.txt")
-
         debates_json = "[" + ",".join(d.model_dump_json() for d in debates) + "]"
 
         prompt = (
-            f"{prompt_template}\n\n"
+            f"{self._prompt_prefix('synthesis_prompt.txt')}"
             f"Context:\n{context.model_dump_json()}\n\n"
             f"Debate Traces:\n{debates_json}"
         )
 
-        content = await self.llm.acompletion(prompt)
+        content = await self.llm.acompletion(prompt, agent=self.agent_name)
 
         try:
             data = self.llm.parse_json(content)
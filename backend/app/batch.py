@@ -0,0 +1,257 @@
+"""Bulk analysis of many PDFs with a resumable manifest.
+
+Documents are parsed in the PDF worker pool and analyzed by one orchestrator, so
+every LLM call of the batch shares the process-wide rate limiter. Each document's
+result JSON and PDF report are written as soon as it finishes, and `manifest.json`
+in the output directory records per-document status; rerunning on the same output
+directory skips documents already done with identical bytes. Run from backend/:
+
+  python -m app.batch ./reports --out ./batch-out --concurrency 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.orchestrator import AetherOrchestrator
+from app.utils import pdf_pool, report_renderer
+from app.utils.llm_cache import cache_enabled
+from app.utils.metrics import get_metrics
+from app.utils.pdf_parser import context_from_pdf, document_info
+from app.utils.result_cache import get_result_cache, hash_bytes
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], 2)
+
+
+def collect_pdfs(inputs: Sequence[Path]) -> List[Path]:
+    """PDF files from a mix of files and directories (directories are not recursed)."""
+    paths: List[Path] = []
+    for item in inputs:
+        if item.is_dir():
+            paths.extend(sorted(p for p in item.iterdir() if p.suffix.lower() == ".pdf"))
+        elif item.suffix.lower() == ".pdf":
+            paths.append(item)
+    return paths
+
+
+def batch_concurrency_from_env() -> int:
+    return max(1, int(os.getenv("BATCH_CONCURRENCY", "4")))
+
+
+class BatchRunner:
+    """Analyze a set of PDFs into `out_dir`, `concurrency` documents at a time."""
+
+    def __init__(
+        self,
+        orchestrator: AetherOrchestrator,
+        out_dir: Path,
+        concurrency: int = 4,
+        reports: bool = True,
+        use_cache: bool = True,
+    ) -> None:
+        self.orchestrator = orchestrator
+        self.out_dir = out_dir
+        self.concurrency = max(1, concurrency)
+        self.reports = reports
+        self.use_cache = use_cache
+        self.manifest_path = out_dir / MANIFEST_NAME
+        self._lock = asyncio.Lock()
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if self.manifest_path.exists():
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        return {"created_at": _now(), "documents": {}, "runs": []}
+
+    def _write_manifest(self, payload: str) -> None:
+        # Write-then-rename so an interrupted batch never leaves a truncated manifest
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        tmp.write_text(payload, encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    async def _save(self) -> None:
+        async with self._lock:
+            self.manifest["updated_at"] = _now()
+            payload = json.dumps(self.manifest, indent=2, ensure_ascii=False)
+            await asyncio.to_thread(self._write_manifest, payload)
+
+    @staticmethod
+    def _names(paths: Sequence[Path]) -> List[str]:
+        """Output names from file stems, suffixed when two inputs share a stem."""
+        seen: Dict[str, int] = {}
+        names = []
+        for path in paths:
+            count = seen.get(path.stem, 0)
+            seen[path.stem] = count + 1
+            names.append(path.stem if count == 0 else f"{path.stem}-{count}")
+        return names
+
+    def _is_done(self, name: str, digest: str) -> bool:
+        entry = self.manifest["documents"].get(name)
+        return (
+            entry is not None
+            and entry.get("status") == "done"
+            and entry.get("sha256") == digest
+            and (self.out_dir / entry["result"]).exists()
+        )
+
+    async def _process(self, name: str, path: Path, data: bytes, digest: str) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {"source": str(path), "sha256": digest, "status": "running", "started_at": _now()}
+        self.manifest["documents"][name] = entry
+        started = time.perf_counter()
+        try:
+            parsed: Dict[str, Any] = {}
+
+            async def compute() -> tuple:
+                t0 = time.perf_counter()
+                with get_metrics().timer("aether_pdf_parse_seconds"):
+                    pdf_data = await pdf_pool.parse_pdf(data)
+                parsed["parse_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+                t1 = time.perf_counter()
+                result = await self.orchestrator.analyze(context_from_pdf(pdf_data))
+                parsed["analyze_ms"] = round((time.perf_counter() - t1) * 1000, 1)
+                return {**result, "document": document_info(pdf_data)}, pdf_data["text"]
+
+            # Same key as /analyze-pdf, so identical bytes share work with the API and within the batch
+            result, narrative = await get_result_cache().get_or_compute("pdf:" + digest, compute, self.use_cache)
+            # Read from the result, so result-cache hits count their pages too
+            pages = (result.get("document") or {}).get("num_pages", 0)
+            entry.update(parsed, pages=pages, session_id=result.get("session_id"))
+
+            result_path = Path("results") / f"{name}.json"
+            payload = json.dumps(result, indent=2, ensure_ascii=False, default=str)
+            await asyncio.to_thread(self._write_file, result_path, payload.encode("utf-8"))
+            entry["result"] = str(result_path)
+
+            if self.reports:
+                t2 = time.perf_counter()
+                pdf_bytes = await report_renderer.render(result, narrative)
+                report_path = Path("reports") / f"{name}.pdf"
+                await asyncio.to_thread(self._write_file, report_path, pdf_bytes)
+                entry.update(report=str(report_path), report_ms=round((time.perf_counter() - t2) * 1000, 1))
+            entry["status"] = "done"
+        except Exception as e:
+            print(f"[BATCH] {name} failed: {e}")
+            entry.update(status="failed", error=str(e)[:500])
+        entry.update(finished_at=_now(), seconds=round(time.perf_counter() - started, 3))
+        await self._save()
+        return entry
+
+    def _write_file(self, relative: Path, data: bytes) -> None:
+        path = self.out_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    async def run(self, paths: Sequence[Path]) -> Dict[str, Any]:
+        """Process every path not already done; returns this run's throughput summary."""
+        cache_enabled.set(self.use_cache)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        skipped: List[str] = []
+        processed: List[Dict[str, Any]] = []
+
+        async def one(name: str, path: Path) -> None:
+            async with semaphore:
+                data = await asyncio.to_thread(path.read_bytes)
+                digest = hash_bytes(data)
+                if self._is_done(name, digest):
+                    skipped.append(name)
+                    return
+                print(f"[BATCH] Analyzing {name}")
+                processed.append(await self._process(name, path, data, digest))
+
+        run_started = _now()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(name, path) for name, path in zip(self._names(paths), paths)))
+        wall = time.perf_counter() - started
+
+        done = [e for e in processed if e["status"] == "done"]
+        seconds = [e["seconds"] for e in done]
+        pages = sum(e.get("pages", 0) for e in done)
+        summary = {
+            "started_at": run_started,
+            "documents": len(paths),
+            "done": len(done),
+            "failed": len(processed) - len(done),
+            "skipped": len(skipped),
+            "pages": pages,
+            "wall_seconds": round(wall, 3),
+            "documents_per_minute": round(len(done) / wall * 60, 2) if wall else 0.0,
+            "pages_per_minute": round(pages / wall * 60, 2) if wall else 0.0,
+            "p50_document_seconds": _percentile(seconds, 50),
+            "p95_document_seconds": _percentile(seconds, 95),
+            "concurrency": self.concurrency,
+        }
+        self.manifest["runs"].append(summary)
+        await self._save()
+        return summary
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Analyze many PDFs into per-document results and reports")
+    parser.add_argument("inputs", nargs="+", type=Path, help="PDF files and/or directories of PDFs")
+    parser.add_argument("--out", type=Path, required=True, help="output directory (holds manifest.json; reuse it to resume)")
+    parser.add_argument("--concurrency", type=int, default=batch_concurrency_from_env(), help="documents in flight")
+    parser.add_argument("--no-reports", action="store_true", help="skip PDF report rendering")
+    parser.add_argument("--no-cache", action="store_true", help="bypass LLM and result caches")
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    paths = collect_pdfs(args.inputs)
+    if not paths:
+        print("No PDF files found")
+        return 1
+
+    orchestrator = AetherOrchestrator()
+    runner = BatchRunner(
+        orchestrator, args.out, args.concurrency, reports=not args.no_reports, use_cache=not args.no_cache
+    )
+    await pdf_pool.warm_up()
+    await orchestrator.reasoning_logger.start()
+    try:
+        summary = await runner.run(paths)
+    finally:
+        await orchestrator.reasoning_logger.stop()
+        await orchestrator.llm.aclose()
+
+    print(
+        f"\n[BATCH] {summary['done']} done, {summary['failed']} failed, {summary['skipped']} skipped "
+        f"in {summary['wall_seconds']}s ({summary['documents_per_minute']} docs/min, "
+        f"{summary['pages_per_minute']} pages/min) → {runner.manifest_path}"
+    )
+    return 1 if summary["failed"] else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    try:
+        return asyncio.run(_main(_parse_args(argv)))
+    finally:
+        pdf_pool.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
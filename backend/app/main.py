@@ -1,17 +1,65 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+import asyncio
+import json
+import os
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, Response
-import pdfplumber
-from io import BytesIO
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from app.schemas.context import ReasoningContext
 from app.orchestrator import AetherOrchestrator
-from app.utils.pdf_generator import AETHERPDFGenerator
-from app.utils.pdf_parser import extract_metadata_and_text
+from app.batch import MANIFEST_NAME, BatchRunner, batch_concurrency_from_env
+from app.utils import report_renderer
+from app.utils import pdf_pool
+from app.utils.llm_cache import cache_enabled
+from app.utils.logger import LEGACY_LOG_NAME
+from app.utils.result_cache import get_result_cache, hash_bytes, hash_text
+from app.utils.jobs import AnalysisJob, get_job_registry
+from app.utils.job_queue import get_job_queue
+from app.utils.metrics import get_metrics
+from app.utils.pdf_parser import context_from_pdf, document_info
+
+
+def _backfill_session_store() -> None:
+    store = orchestrator.session_store
+    logger = orchestrator.reasoning_logger
+    legacy = logger.migrate_legacy(orchestrator.logs_dir / LEGACY_LOG_NAME)
+    if store.count() == 0:
+        imported = store.import_sessions(logger.iter_sessions())
+        if imported:
+            print(f"[SESSIONS] Indexed {imported} sessions from the reasoning log")
+    elif legacy:
+        # The index predates the migration, so only the converted history is new to it
+        imported = store.import_sessions(legacy)
+        print(f"[SESSIONS] Indexed {imported} migrated legacy sessions")
+
 
-app = FastAPI(title="Project AETHER", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Workers spawn (and import the table stack) in the background so / and /status answer immediately
+    warm_up = asyncio.create_task(pdf_pool.warm_up())
+    await orchestrator.reasoning_logger.start()
+    await asyncio.to_thread(_backfill_session_store)
+    job_queue.start()
+    yield
+    for task in batch_tasks.values():
+        task.cancel()
+    await asyncio.gather(*batch_tasks.values(), return_exceptions=True)
+    warm_up.cancel()
+    await asyncio.gather(warm_up, return_exceptions=True)
+    await job_queue.stop()
+    await orchestrator.reasoning_logger.stop()
+    await orchestrator.llm.aclose()
+    pdf_pool.shutdown()
+
+
+app = FastAPI(title="Project AETHER", version="1.0.0", lifespan=lifespan)
 
 # Basic CORS setup (adjust as needed)
 app.add_middleware(
@@ -20,17 +68,177 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Job-Id"],
 )
 
 orchestrator = AetherOrchestrator()
-pdf_generator = AETHERPDFGenerator()
+result_cache = get_result_cache()
+jobs = get_job_registry()
+job_queue = get_job_queue(jobs)
+batch_dir = Path(os.getenv("AETHER_BATCH_DIR") or orchestrator.logs_dir / "batches")
+batch_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _run_job(job: AnalysisJob, key: str, compute, use_cache: bool) -> tuple[dict, str]:
+    """Resolve a pipeline run through the result cache and record the outcome on the job."""
+    try:
+        result, narrative = await result_cache.get_or_compute(key, compute, use_cache)
+    except HTTPException as e:
+        jobs.fail(job, str(e.detail))
+        raise
+    except Exception as e:
+        jobs.fail(job, str(e))
+        raise
+    jobs.finish(job, result, narrative)
+    return result, narrative
+
+
+async def _analyze_context(
+    context: ReasoningContext, use_cache: bool, job: AnalysisJob, previous_session_id: Optional[str] = None
+) -> tuple[dict, str]:
+    """Run (or reuse) the full pipeline for a context; returns (result, narrative)."""
+    async def compute() -> tuple[dict, str]:
+        result = await orchestrator.analyze(context, job=job, previous_session_id=previous_session_id)
+        return result, context.narrative
+
+    key = "context:" + hash_text(context.model_dump_json())
+    return await _run_job(job, key, compute, use_cache)
+
+
+async def _parse_pdf(file_bytes: bytes, job: AnalysisJob) -> dict:
+    job.set_status("parsing", "Parsing PDF")
+    try:
+        with get_metrics().timer("aether_pdf_parse_seconds"):
+            return await pdf_pool.parse_pdf(file_bytes)
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
+async def _analyze_pdf_bytes(
+    file_bytes: bytes, use_cache: bool, job: AnalysisJob
+) -> tuple[dict, str]:
+    """Parse and analyze a PDF (or reuse a previous run on identical bytes)."""
+    async def compute() -> tuple[dict, str]:
+        pdf_data = await _parse_pdf(file_bytes, job)
+        result = await orchestrator.analyze(context_from_pdf(pdf_data), job=job)
+        return {**result, "document": document_info(pdf_data)}, pdf_data["text"]
+
+    key = "pdf:" + hash_bytes(file_bytes)
+    return await _run_job(job, key, compute, use_cache)
+
+
+async def _pdf_response(
+    result: dict, narrative: str, filename: str, stream: bool = False, job_id: Optional[str] = None
+) -> Response:
+    """Render (or reuse) a report off the event loop; `stream` sends it as chunked bytes."""
+    pdf_bytes = await report_renderer.render(result, narrative)
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if job_id:
+        headers["X-Job-Id"] = job_id
+    if stream:
+        return StreamingResponse(
+            report_renderer.iter_chunks(pdf_bytes), media_type="application/pdf", headers=headers
+        )
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
+
+
+async def _report_response(job: AnalysisJob, filename: str, stream: bool = False) -> Response:
+    return await _pdf_response(job.result, job.narrative, filename, stream, job.job_id)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_analysis(
+    key: str,
+    prepare: Callable[
+        [Callable[[str, dict], Awaitable[None]]], Awaitable[Tuple[ReasoningContext, str, Optional[dict]]]
+    ],
+    use_cache: bool,
+    job: AnalysisJob,
+    previous_session_id: Optional[str] = None,
+) -> AsyncIterator[str]:
+    """Yield SSE frames (factors → debate per factor → final_report) as the pipeline progresses.
+
+    Runs go through the result cache's single flight like the other endpoints: a
+    cached result, or one computed by an identical request already in flight, is
+    replayed as the same event sequence. Errors are sent as an `error` event since
+    the HTTP status has already been committed.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_event(event: str, data: dict) -> None:
+        await queue.put((event, data))
+
+    async def run() -> None:
+        ran = False
+
+        async def compute() -> Tuple[dict, str]:
+            nonlocal ran
+            ran = True
+            context, narrative, document = await prepare(on_event)
+            result = await orchestrator.analyze(
+                context, on_event=on_event, job=job, previous_session_id=previous_session_id
+            )
+            if document is not None:
+                result = {**result, "document": document}
+            return result, narrative
+
+        try:
+            await on_event("job", {"job_id": job.job_id})
+            result, narrative = await result_cache.get_or_compute(key, compute, use_cache)
+            if not ran:
+                await on_event("factors", {"factors": result["factors"]})
+                total = len(result["debate_logs"])
+                for i, debate in enumerate(result["debate_logs"], 1):
+                    await on_event("debate", {"index": i, "total": total, "debate": debate})
+                await on_event("final_report", {"final_report": result["final_report"]})
+            jobs.finish(job, result, narrative)
+        except HTTPException as e:
+            jobs.fail(job, str(e.detail))
+            await on_event("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            print("\nEXCEPTION IN streaming analysis")
+            traceback.print_exc()
+            jobs.fail(job, str(e))
+            await on_event("error", {"status_code": 500, "detail": str(e)})
+        finally:
+            await queue.put(None)
+
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            yield _sse(*item)
+    finally:
+        # Client went away before the pipeline finished
+        if not task.done():
+            task.cancel()
+            jobs.fail(job, "Client disconnected")
+
+
+def _event_stream(frames: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 
 import traceback
 @app.post("/analyze")
-async def analyze(context: ReasoningContext):
+async def analyze(
+    context: ReasoningContext, no_cache: bool = False, previous_session_id: Optional[str] = None
+):
+    """Run the pipeline; with `previous_session_id`, only factors touched by the edits are re-debated."""
     try:
-        result = await orchestrator.analyze(context)
-        return result
+        cache_enabled.set(not no_cache)
+        job = jobs.create("analyze")
+        result, _ = await _analyze_context(context, not no_cache, job, previous_session_id)
+        return {**result, "job_id": job.job_id}
     except HTTPException:
         raise
     except Exception as e:
@@ -40,23 +248,16 @@ async def analyze(context: ReasoningContext):
     
 
 @app.post("/analyze-pdf")
-async def analyze_pdf(file: UploadFile = File(...)):
+async def analyze_pdf(file: UploadFile = File(...), no_cache: bool = False):
     try:
+        cache_enabled.set(not no_cache)
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
         file_bytes = await file.read()
-        pdf_data = extract_metadata_and_text(file_bytes)
-        
-        context = ReasoningContext(
-            narrative=pdf_data["text"],
-            extracted_facts=[],
-            metrics=pdf_data.get("metrics", []),
-            assumptions=[],
-            limitations=[]
-        )
-        result = await orchestrator.analyze(context)
-        return result
+        job = jobs.create("analyze-pdf")
+        result, _ = await _analyze_pdf_bytes(file_bytes, use_cache=not no_cache, job=job)
+        return {**result, "job_id": job.job_id}
     except HTTPException:
         raise
     except Exception as e:
@@ -65,6 +266,48 @@ async def analyze_pdf(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
     
 
+@app.post("/analyze/stream")
+async def analyze_stream(
+    context: ReasoningContext, no_cache: bool = False, previous_session_id: Optional[str] = None
+):
+    """Server-Sent Events variant of /analyze."""
+    cache_enabled.set(not no_cache)
+
+    async def prepare(on_event) -> Tuple[ReasoningContext, str, Optional[dict]]:
+        return context, context.narrative, None
+
+    key = "context:" + hash_text(context.model_dump_json())
+    job = jobs.create("analyze-stream")
+    return _event_stream(
+        _stream_analysis(key, prepare, use_cache=not no_cache, job=job, previous_session_id=previous_session_id)
+    )
+
+
+@app.post("/analyze-pdf/stream")
+async def analyze_pdf_stream(file: UploadFile = File(...), no_cache: bool = False):
+    """Server-Sent Events variant of /analyze-pdf; emits a `document` event once parsing is done."""
+    cache_enabled.set(not no_cache)
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    # Read before returning: the upload is closed once the response starts streaming
+    file_bytes = await file.read()
+
+    job = jobs.create("analyze-pdf-stream")
+
+    async def prepare(on_event) -> Tuple[ReasoningContext, str, Optional[dict]]:
+        pdf_data = await _parse_pdf(file_bytes, job)
+        await on_event("document", {
+            "num_pages": pdf_data["num_pages"],
+            "metadata": pdf_data["metadata"],
+            "metrics": len(pdf_data["metrics"]),
+        })
+        return context_from_pdf(pdf_data), pdf_data["text"], document_info(pdf_data)
+
+    key = "pdf:" + hash_bytes(file_bytes)
+    return _event_stream(_stream_analysis(key, prepare, use_cache=not no_cache, job=job))
+
+
 @app.get("/")
 async def root():
     return {"service": "Project AETHER", "status": "ok"}
@@ -72,21 +315,43 @@ async def root():
 
 @app.get("/status")
 async def status():
-    return orchestrator.status
+    cache = orchestrator.llm.cache
+    return {
+        **orchestrator.status,
+        "llm_cache": cache.stats() if cache is not None else {"enabled": False},
+        "result_cache": result_cache.stats(),
+        "report_cache": report_renderer.get_report_cache().stats(),
+        "jobs": jobs.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition: per-agent LLM latency/tokens, stage, PDF parse and render histograms."""
+    return PlainTextResponse(get_metrics().render(), media_type="text/plain; version=0.0.4")
+
+
+def _get_job(job_id: str) -> AnalysisJob:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job id")
+    return job
+
+
+@app.get("/status/{job_id}")
+async def job_status(job_id: str):
+    """Progress of a single analysis, isolated from other requests."""
+    return _get_job(job_id).describe()
 
 
 @app.post("/analyze-report")
-async def analyze_report(context: ReasoningContext):
+async def analyze_report(context: ReasoningContext, no_cache: bool = False, stream: bool = False):
     """Analyze text context and return PDF report."""
     try:
-        result = await orchestrator.analyze(context)
-        pdf_bytes = pdf_generator.generate_report(result, context.narrative)
-        
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=Analysis_Report.pdf"}
-        )
+        cache_enabled.set(not no_cache)
+        job = jobs.create("analyze-report")
+        await _analyze_context(context, use_cache=not no_cache, job=job)
+        return await _report_response(job, "Analysis_Report.pdf", stream)
     except HTTPException:
         raise
     except Exception as e:
@@ -96,30 +361,19 @@ async def analyze_report(context: ReasoningContext):
 
 
 @app.post("/analyze-pdf-report")
-async def analyze_pdf_report(file: UploadFile = File(...)):
+async def analyze_pdf_report(
+    file: UploadFile = File(...), no_cache: bool = False, stream: bool = False
+):
     """Upload PDF, analyze it, and return PDF report."""
     try:
+        cache_enabled.set(not no_cache)
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
         file_bytes = await file.read()
-        pdf_data = extract_metadata_and_text(file_bytes)
-        
-        context = ReasoningContext(
-            narrative=pdf_data["text"],
-            extracted_facts=[],
-            metrics=pdf_data.get("metrics", []),
-            assumptions=[],
-            limitations=[]
-        )
-        result = await orchestrator.analyze(context)
-        pdf_bytes = pdf_generator.generate_report(result, pdf_data["text"])
-        
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=PDF_Analysis_Report.pdf"}
-        )
+        job = jobs.create("analyze-pdf-report")
+        await _analyze_pdf_bytes(file_bytes, use_cache=not no_cache, job=job)
+        return await _report_response(job, "PDF_Analysis_Report.pdf", stream)
     except HTTPException:
         raise
     except Exception as e:
@@ -128,26 +382,270 @@ async def analyze_pdf_report(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _submit(job: AnalysisJob, runner, priority: int) -> JSONResponse:
+    try:
+        job_queue.submit(job, runner, priority)
+    except OverflowError as e:
+        jobs.fail(job, str(e))
+        raise HTTPException(status_code=429, detail=str(e))
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job.job_id,
+            "status_url": f"/jobs/{job.job_id}",
+            "result_url": f"/jobs/{job.job_id}/result",
+            "report_url": f"/download-report/{job.job_id}",
+        },
+    )
+
+
+@app.post("/jobs/analyze")
+async def submit_analyze(
+    context: ReasoningContext,
+    priority: int = 0,
+    no_cache: bool = False,
+    previous_session_id: Optional[str] = None,
+):
+    """Queue an /analyze run and return its job id immediately."""
+    job = jobs.create("analyze")
+
+    async def runner(job: AnalysisJob) -> None:
+        cache_enabled.set(not no_cache)
+        await _analyze_context(context, not no_cache, job, previous_session_id)
+
+    return _submit(job, runner, priority)
+
+
+@app.post("/jobs/analyze-pdf")
+async def submit_analyze_pdf(
+    file: UploadFile = File(...), priority: int = 0, no_cache: bool = False
+):
+    """Queue an /analyze-pdf run and return its job id immediately."""
+    if not file.filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    file_bytes = await file.read()
+    job = jobs.create("analyze-pdf")
+
+    async def runner(job: AnalysisJob) -> None:
+        cache_enabled.set(not no_cache)
+        await _analyze_pdf_bytes(file_bytes, use_cache=not no_cache, job=job)
+
+    return _submit(job, runner, priority)
+
+
+@app.get("/jobs")
+async def job_queue_stats():
+    """Queue depth, worker usage, throughput and wait/run latency percentiles."""
+    return {**job_queue.stats(), "registry": jobs.stats()}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = _get_job(job_id)
+    return {**job.describe(), "queue_position": job_queue.position(job)}
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Analysis JSON for a finished job (202 while it is still queued or running)."""
+    job = _get_job(job_id)
+    if job.error:
+        raise HTTPException(status_code=409, detail=f"Analysis failed: {job.error}")
+    if job.result is None:
+        return JSONResponse(status_code=202, content=job.describe())
+    return {**job.result, "job_id": job.job_id}
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = _get_job(job_id)
+    if not job_queue.cancel(job):
+        raise HTTPException(status_code=409, detail="Job already finished")
+    return job.describe()
+
+
+def _batch_path(batch_id: str) -> Path:
+    # Batch ids are uuid hex; anything else could point outside batch_dir
+    if not batch_id.isalnum():
+        raise HTTPException(status_code=404, detail="Unknown batch id")
+    return batch_dir / batch_id
+
+
+def _start_batch(batch_id: str, concurrency: int, reports: bool, use_cache: bool) -> None:
+    out_dir = _batch_path(batch_id)
+    runner = BatchRunner(orchestrator, out_dir, concurrency, reports=reports, use_cache=use_cache)
+    paths = sorted((out_dir / "inputs").glob("*.pdf"))
+
+    async def run() -> None:
+        try:
+            summary = await runner.run(paths)
+            print(f"[BATCH] {batch_id}: {summary['done']} done, {summary['failed']} failed in {summary['wall_seconds']}s")
+        except Exception:
+            print(f"\nEXCEPTION IN batch {batch_id}")
+            traceback.print_exc()
+        finally:
+            batch_tasks.pop(batch_id, None)
+
+    batch_tasks[batch_id] = asyncio.create_task(run())
+
+
+def _batch_accepted(batch_id: str, documents: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=202,
+        content={"batch_id": batch_id, "documents": documents, "status_url": f"/batch/{batch_id}"},
+    )
+
+
+@app.post("/batch/analyze-pdf")
+async def submit_batch(
+    files: List[UploadFile] = File(...),
+    concurrency: Optional[int] = Query(None, ge=1, le=64),
+    reports: bool = True,
+    no_cache: bool = False,
+):
+    """Analyze many PDFs in the background; results and reports are written per document."""
+    if any(not f.filename.lower().endswith(".pdf") for f in files):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    batch_id = uuid.uuid4().hex
+    inputs = _batch_path(batch_id) / "inputs"
+    inputs.mkdir(parents=True)
+    width = len(str(len(files) - 1))
+    for i, f in enumerate(files):
+        data = await f.read()
+        # Path(...).name drops any client-supplied directories. The zero-padded index keeps
+        # names unique and in upload order, and the lower-case suffix keeps `.PDF` uploads
+        # visible to the worker's "*.pdf" glob
+        target = inputs / f"{i:0{width}d}-{Path(Path(f.filename).name).stem}.pdf"
+        await asyncio.to_thread(target.write_bytes, data)
+    _start_batch(batch_id, concurrency or batch_concurrency_from_env(), reports, not no_cache)
+    return _batch_accepted(batch_id, len(files))
+
+
+def _batch_manifest(batch_id: str) -> dict:
+    manifest_path = _batch_path(batch_id) / MANIFEST_NAME
+    if not manifest_path.exists():
+        if batch_id in batch_tasks:
+            return {"documents": {}, "runs": []}
+        raise HTTPException(status_code=404, detail="Unknown batch id")
+    return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+
+@app.get("/batch/{batch_id}")
+async def batch_status(batch_id: str):
+    """Per-document status of a batch and the throughput summary of each run."""
+    manifest = await asyncio.to_thread(_batch_manifest, batch_id)
+    counts: Dict[str, int] = {}
+    for entry in manifest["documents"].values():
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    return {"batch_id": batch_id, "running": batch_id in batch_tasks, "counts": counts, **manifest}
+
+
+@app.post("/batch/{batch_id}/resume")
+async def resume_batch(
+    batch_id: str,
+    concurrency: Optional[int] = Query(None, ge=1, le=64),
+    reports: bool = True,
+    no_cache: bool = False,
+):
+    """Re-run a stopped batch; documents already done are skipped."""
+    if batch_id in batch_tasks:
+        raise HTTPException(status_code=409, detail="Batch is still running")
+    inputs = _batch_path(batch_id) / "inputs"
+    if not inputs.is_dir():
+        raise HTTPException(status_code=404, detail="Unknown batch id")
+    _start_batch(batch_id, concurrency or batch_concurrency_from_env(), reports, not no_cache)
+    return _batch_accepted(batch_id, len(list(inputs.glob("*.pdf"))))
+
+
+@app.get("/sessions")
+async def list_sessions(
+    limit: int = Query(20, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    domain: Optional[str] = None,
+    context_hash: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    max_confidence: Optional[float] = None,
+):
+    """Page through past analyses, newest first. Timestamps are ISO-8601 UTC."""
+    return await asyncio.to_thread(
+        orchestrator.session_store.query,
+        limit=limit,
+        offset=offset,
+        since=since,
+        until=until,
+        domain=domain,
+        context_hash=context_hash,
+        min_confidence=min_confidence,
+        max_confidence=max_confidence,
+    )
+
+
+async def _get_session(session_id: str) -> dict:
+    session = await asyncio.to_thread(orchestrator.session_store.get, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown session id")
+    return session
+
+
+@app.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    """Full reasoning trace of a past analysis."""
+    return await _get_session(session_id)
+
+
+@app.get("/sessions/{session_id}/report")
+async def session_report(session_id: str, stream: bool = False):
+    """Re-render the PDF report of a past analysis without re-running it."""
+    try:
+        session = await _get_session(session_id)
+        result = {
+            "final_report": session.get("final_report", {}),
+            "factors": session.get("factors", []),
+            "debate_logs": session.get("debate_logs", []),
+        }
+        narrative = session.get("input_context", {}).get("narrative", "")
+        return await _pdf_response(result, narrative, "Analysis_Report.pdf", stream)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print("\nEXCEPTION IN /sessions/{session_id}/report")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/download-report")
-async def download_report():
+async def download_report(stream: bool = False):
     """Return PDF report for the most recent analysis without re-running."""
     try:
-        if not orchestrator.last_result or not orchestrator.last_narrative:
+        job = jobs.latest_completed()
+        if job is None or not job.narrative:
             raise HTTPException(status_code=400, detail="No analysis available for report download")
 
-        pdf_bytes = pdf_generator.generate_report(
-            orchestrator.last_result,
-            orchestrator.last_narrative,
-        )
-
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=Analysis_Report.pdf"},
-        )
+        return await _report_response(job, "Analysis_Report.pdf", stream)
     except HTTPException:
         raise
     except Exception as e:
         print("\nEXCEPTION IN /download-report")
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/download-report/{job_id}")
+async def download_job_report(job_id: str, stream: bool = False):
+    """Return the PDF report for a specific analysis job."""
+    try:
+        job = _get_job(job_id)
+        if job.error:
+            raise HTTPException(status_code=409, detail=f"Analysis failed: {job.error}")
+        if job.result is None:
+            raise HTTPException(status_code=409, detail="Analysis not finished yet")
+
+        return await _report_response(job, "Analysis_Report.pdf", stream)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print("\nEXCEPTION IN /download-report/{job_id}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
 
 from app.agents.factor_extractor import FactorExtractorAgent
 from app.agents.support_agent import SupportAgent
@@ -11,10 +17,27 @@ from app.agents.opposition_agent import OppositionAgent
 from app.agents.synthesizer_agent import SynthesizerAgent
 from app.schemas.context import ReasoningContext
 from app.schemas.factor import Factor
-from app.schemas.debate import DebateTrace, SupportArguments, OppositionCounterArguments
+from app.schemas.debate import (
+    CounterArgument,
+    DebateTrace,
+    OppositionCounterArguments,
+    SupportArgument,
+    SupportArguments,
+)
 from app.schemas.final_report import FinalReport
-from app.utils.logger import ReasoningLogger
+from app.utils.context_compactor import context_budgets_from_env, context_compactor_from_env
+from app.utils.context_diff import ContextDiff, diff_contexts
+from app.utils.jobs import AnalysisJob
+from app.utils.logger import reasoning_logger_from_env
+from app.utils.result_cache import hash_text
+from app.utils.session_store import session_store_from_env
 from app.utils.llm_client import LLMClient
+from app.utils.metrics import call_records, get_metrics, summarize_calls
+from app.utils.retrieval import RetrievalIndex, context_retriever_from_env
+
+
+# Receives (event_name, payload) as pipeline stages complete, e.g. for SSE streaming
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
 
 
 class AetherOrchestrator:
@@ -26,24 +49,360 @@ class AetherOrchestrator:
         self.support_agent = SupportAgent(self.llm)
         self.opposition_agent = OppositionAgent(self.llm)
         self.synthesizer_agent = SynthesizerAgent(self.llm)
-        self.logs_dir = Path(__file__).resolve().parents[1] / "logs"
-        self.log_file = self.logs_dir / "reasoning_logs.json"
+        self.logs_dir = Path(os.getenv("AETHER_LOGS_DIR") or Path(__file__).resolve().parents[1] / "logs")
         self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self.reasoning_logger = reasoning_logger_from_env(self.logs_dir)
+        self.session_store = session_store_from_env(self.logs_dir)
         self.status: Dict[str, Any] = {
             "phase": "idle",
             "message": "Idle",
             "updated_at": datetime.utcnow().isoformat() + "Z",
         }
-        self.last_result: Dict[str, Any] | None = None
-        self.last_narrative: str | None = None
+        # Max number of factor debates (support → opposition chains) in flight at once.
+        # 1 restores the strictly sequential behaviour.
+        self.debate_concurrency = max(1, int(os.getenv("AETHER_DEBATE_CONCURRENCY", "4")))
+        # Batched mode: one support call and one opposition call cover every factor
+        self.batched_debates = os.getenv("AETHER_DEBATE_BATCHED", "false").lower() in ("1", "true", "yes")
+        # Pipelined mode: opposition starts on each group of support arguments as soon as they validate
+        self.pipelined_opposition = os.getenv("AETHER_OPPOSITION_PIPELINED", "false").lower() in ("1", "true", "yes")
+        self.opposition_group_size = max(1, int(os.getenv("AETHER_OPPOSITION_GROUP_SIZE", "1")))
+        if self.pipelined_opposition and not self.llm.streaming:
+            print("[ORCHESTRATOR] AETHER_OPPOSITION_PIPELINED needs LLM_STREAMING=true; one opposition call per factor")
+        # Per-agent token budgets for the (possibly compacted) context; None disables compaction
+        self.compactor = context_compactor_from_env()
+        self.context_budgets = context_budgets_from_env()
+        # Per-factor BM25 retrieval narrows the support view further; needs compaction's chunks
+        self.retriever = context_retriever_from_env()
+        # Opt-in: also reuse debates whose inputs changed when no edited fact/metric shares a term with the factor
+        self.reuse_untouched_debates = (
+            os.getenv("AETHER_REUSE_UNTOUCHED_DEBATES", "false").lower() in ("1", "true", "yes")
+        )
+        # Opt-in: give every factor the shared support view when it is large enough for the
+        # backend's context cache, instead of a per-factor retrieval view
+        self.prefer_cached_support = (
+            os.getenv("CONTEXT_RETRIEVAL_PREFER_CACHE", "false").lower() in ("1", "true", "yes")
+        )
 
-    def _set_status(self, phase: str, message: str, **details: Any) -> None:
+    def _set_status(
+        self, phase: str, message: str, job: Optional[AnalysisJob] = None, **details: Any
+    ) -> None:
+        # self.status is the process-wide "latest activity" view; per-request progress lives on the job
         self.status = {
             "phase": phase,
             "message": message,
             "updated_at": datetime.utcnow().isoformat() + "Z",
             **details,
         }
+        if job is not None:
+            job.set_status(phase, message, **details)
+
+    @staticmethod
+    async def _emit(on_event: Optional[EventCallback], event: str, data: Dict[str, Any]) -> None:
+        if on_event is not None:
+            await on_event(event, data)
+
+    async def _debate_factor(
+        self,
+        factor: Factor,
+        context: ReasoningContext,
+        index: int,
+        total: int,
+        semaphore: asyncio.Semaphore,
+        on_event: Optional[EventCallback] = None,
+        job: Optional[AnalysisJob] = None,
+        retrieval: Optional[RetrievalIndex] = None,
+    ) -> DebateTrace:
+        """Run the support → opposition chain for a single factor."""
+        async with semaphore:
+            print(f"\n[ORCHESTRATOR] Processing factor {index}/{total}: {factor.factor_id}")
+
+            self._set_status(
+                "support",
+                f"Generating support for {factor.factor_id}",
+                job,
+                factor_index=index,
+                factor_total=total,
+                factor_id=factor.factor_id,
+            )
+            print(f"  → [{factor.factor_id}] Generating support arguments...")
+            on_argument = on_counter = None
+            if on_event is not None:
+                # Partial results for SSE clients; with LLM_STREAMING they arrive as each argument validates
+                async def on_argument(argument: SupportArgument) -> None:
+                    await on_event("support_argument", {"factor_id": factor.factor_id, "argument": argument.dict()})
+
+                async def on_counter(counter: CounterArgument) -> None:
+                    await on_event("counter_argument", {"factor_id": factor.factor_id, "argument": counter.dict()})
+
+            def opposition_started() -> None:
+                self._set_status(
+                    "opposition",
+                    f"Generating opposition for {factor.factor_id}",
+                    job,
+                    factor_index=index,
+                    factor_total=total,
+                    factor_id=factor.factor_id,
+                )
+                print(f"  → [{factor.factor_id}] Generating opposition arguments...")
+
+            support_context = self._support_context([factor], context, retrieval)
+            # Without streaming the support answer lands at once, so pipelining would only
+            # multiply opposition calls; one call per factor covers the same arguments
+            if self.pipelined_opposition and self.llm.streaming:
+                support, opposition = await self._pipelined_debate(
+                    factor, support_context, on_argument, on_counter, opposition_started
+                )
+                print(
+                    f"  → [{factor.factor_id}] Support/opposition generated: "
+                    f"{len(support.support_arguments)}/{len(opposition.counter_arguments)} arguments"
+                )
+            else:
+                support: SupportArguments = await self.support_agent.generate_support(
+                    factor, support_context, on_argument
+                )
+                print(f"  → [{factor.factor_id}] Support generated: {len(support.support_arguments)} arguments")
+
+                opposition_started()
+                opposition: OppositionCounterArguments = await self.opposition_agent.generate_counters(
+                    factor, support, on_counter
+                )
+                print(f"  → [{factor.factor_id}] Opposition generated: {len(opposition.counter_arguments)} arguments")
+
+            debate = DebateTrace(
+                factor_id=factor.factor_id,
+                factor=factor,
+                support=support,
+                opposition=opposition,
+            )
+            await self._emit(on_event, "debate", {"index": index, "total": total, "debate": debate.dict()})
+            return debate
+
+    async def _pipelined_debate(
+        self,
+        factor: Factor,
+        context: ReasoningContext,
+        on_argument: Optional[Callable[[SupportArgument], Awaitable[None]]] = None,
+        on_counter: Optional[Callable[[CounterArgument], Awaitable[None]]] = None,
+        on_opposition: Optional[Callable[[], None]] = None,
+    ) -> Tuple[SupportArguments, OppositionCounterArguments]:
+        """Support, with one opposition call per group of arguments started as each group completes.
+
+        Counter-arguments are merged in support order, so the output schema is unchanged.
+        Used with LLM_STREAMING, where the first opposition call overlaps the rest of the
+        support answer. `on_opposition` is called when the first group is launched.
+        """
+        group: List[SupportArgument] = []
+        tasks: List[asyncio.Task] = []
+
+        def launch() -> None:
+            if not tasks and on_opposition is not None:
+                on_opposition()
+            claims = SupportArguments(support_arguments=list(group))
+            group.clear()
+            tasks.append(asyncio.create_task(
+                self.opposition_agent.generate_claim_counters(factor, claims, on_counter)
+            ))
+
+        async def collect(argument: SupportArgument) -> None:
+            if on_argument is not None:
+                await on_argument(argument)
+            group.append(argument)
+            if len(group) >= self.opposition_group_size:
+                launch()
+
+        try:
+            support = await self.support_agent.generate_support(factor, context, collect)
+            if group:
+                launch()
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return support, OppositionCounterArguments(
+            counter_arguments=[c for part in parts for c in part.counter_arguments]
+        )
+
+    async def _run_debates(
+        self,
+        factors: List[Factor],
+        context: ReasoningContext,
+        on_event: Optional[EventCallback] = None,
+        job: Optional[AnalysisJob] = None,
+        retrieval: Optional[RetrievalIndex] = None,
+    ) -> List[DebateTrace]:
+        """Debate all factors concurrently; results keep the extraction order."""
+        semaphore = asyncio.Semaphore(self.debate_concurrency)
+        total = len(factors)
+        tasks = [
+            asyncio.create_task(
+                self._debate_factor(factor, context, i, total, semaphore, on_event, job, retrieval)
+            )
+            for i, factor in enumerate(factors, 1)
+        ]
+        try:
+            # gather preserves input order regardless of completion order
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _run_debates_batched(
+        self,
+        factors: List[Factor],
+        context: ReasoningContext,
+        on_event: Optional[EventCallback] = None,
+        job: Optional[AnalysisJob] = None,
+        retrieval: Optional[RetrievalIndex] = None,
+    ) -> List[DebateTrace]:
+        """Two LLM calls for all factors, with per-factor fallback for anything that fails to validate."""
+        total = len(factors)
+        semaphore = asyncio.Semaphore(self.debate_concurrency)
+
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+
+        self._set_status("support", f"Generating support for {total} factors", job, factor_total=total)
+        print(f"\n[ORCHESTRATOR] Batched support for {total} factors...")
+        try:
+            supports = await self.support_agent.generate_support_batch(
+                factors, self._support_context(factors, context, retrieval)
+            )
+        except Exception as e:
+            print(f"[ORCHESTRATOR] Batched support failed, falling back per factor: {e}")
+            supports = {}
+        missing = [f for f in factors if f.factor_id not in supports]
+        if missing:
+            print(f"[ORCHESTRATOR] Per-factor support fallback for {[f.factor_id for f in missing]}")
+            fallback = await asyncio.gather(
+                *(
+                    bounded(
+                        self.support_agent.generate_support(f, self._support_context([f], context, retrieval))
+                    )
+                    for f in missing
+                )
+            )
+            supports.update({f.factor_id: support for f, support in zip(missing, fallback)})
+
+        self._set_status("opposition", f"Generating opposition for {total} factors", job, factor_total=total)
+        print(f"[ORCHESTRATOR] Batched opposition for {total} factors...")
+        pairs = [(f, supports[f.factor_id]) for f in factors]
+        try:
+            oppositions = await self.opposition_agent.generate_counters_batch(pairs)
+        except Exception as e:
+            print(f"[ORCHESTRATOR] Batched opposition failed, falling back per factor: {e}")
+            oppositions = {}
+        missing_pairs = [(f, sup) for f, sup in pairs if f.factor_id not in oppositions]
+        if missing_pairs:
+            print(f"[ORCHESTRATOR] Per-factor opposition fallback for {[f.factor_id for f, _ in missing_pairs]}")
+            fallback = await asyncio.gather(
+                *(bounded(self.opposition_agent.generate_counters(f, sup)) for f, sup in missing_pairs)
+            )
+            oppositions.update({f.factor_id: opp for (f, _), opp in zip(missing_pairs, fallback)})
+
+        debate_logs: List[DebateTrace] = []
+        for i, factor in enumerate(factors, 1):
+            debate = DebateTrace(
+                factor_id=factor.factor_id,
+                factor=factor,
+                support=supports[factor.factor_id],
+                opposition=oppositions[factor.factor_id],
+            )
+            debate_logs.append(debate)
+            await self._emit(on_event, "debate", {"index": i, "total": total, "debate": debate.dict()})
+        return debate_logs
+
+    def _prepare_views(
+        self, context: ReasoningContext
+    ) -> Tuple[Dict[str, ReasoningContext], Dict[str, Any], Optional[RetrievalIndex]]:
+        prepared = self.compactor.prepare(context)
+        views, stats = self.compactor.build_views(prepared, self.context_budgets)
+        retrieval = None
+        if self.retriever is not None:
+            retrieval = self.retriever.index(prepared, self.context_budgets["support"], views["support"])
+        return views, stats, retrieval
+
+    async def _compact_context(
+        self, context: ReasoningContext, job: Optional[AnalysisJob] = None
+    ) -> Tuple[Dict[str, ReasoningContext], Dict[str, Any], Optional[RetrievalIndex]]:
+        """Per-agent context views plus the per-factor retrieval index (built once per analysis).
+
+        Contexts already within budget pass through untouched. With
+        CONTEXT_RETRIEVAL_PREFER_CACHE, retrieval is skipped when the shared support view
+        is large enough for the backend's context cache: every factor then sends the same
+        template + context prefix, billed at the cached rate once the cache exists.
+        """
+        if self.compactor is None:
+            return {agent: context for agent in self.context_budgets}, {}, None
+        self._set_status("compacting", "Compacting context", job)
+        views, stats, retrieval = await asyncio.to_thread(self._prepare_views, context)
+        print(f"[ORCHESTRATOR] Context ~{stats['original_tokens']} tokens → views {stats['view_tokens']}")
+        if (
+            retrieval is not None
+            and self.prefer_cached_support
+            # A batched debate is one support call, so there is no prefix to share
+            and not self.batched_debates
+            and self.llm.caches_prefix(self.support_agent.context_prefix(views["support"]))
+        ):
+            print("[ORCHESTRATOR] Support view is context-cacheable; sharing it instead of per-factor retrieval")
+            stats["retrieval"] = "skipped: shared support view is context-cached"
+            retrieval = None
+        return views, stats, retrieval
+
+    @staticmethod
+    def _support_context(
+        factors: List[Factor], context: ReasoningContext, retrieval: Optional[RetrievalIndex]
+    ) -> ReasoningContext:
+        """Factor-specific support context when retrieval is on, else the shared support view."""
+        return retrieval.view(factors) if retrieval is not None else context
+
+    def _debate_fingerprint(
+        self, factor: Factor, context: ReasoningContext, retrieval: Optional[RetrievalIndex]
+    ) -> str:
+        """Hash of what the factor's support prompt is built from (factor + its context view)."""
+        view = self._support_context([factor], context, retrieval)
+        return hash_text(factor.model_dump_json() + view.model_dump_json())
+
+    async def _load_previous(self, session_id: str) -> Dict[str, Any]:
+        previous = await asyncio.to_thread(self.session_store.get, session_id)
+        if previous is None:
+            raise HTTPException(status_code=404, detail=f"Unknown previous session id: {session_id}")
+        return previous
+
+    def _reusable_debates(
+        self,
+        previous: Dict[str, Any],
+        diff: ContextDiff,
+        factors: List[Factor],
+        context: ReasoningContext,
+        retrieval: Optional[RetrievalIndex],
+    ) -> Dict[str, DebateTrace]:
+        """Previous debates for factors the edits leave alone, keyed by the current factor_id.
+
+        A debate is reused when its factor is unchanged and its prompt inputs are
+        byte-identical. With AETHER_REUSE_UNTOUCHED_DEBATES it is also reused when the
+        edits are confined to facts and metrics, none of which share a term with the factor.
+        """
+        by_factor = {
+            (d["factor"]["description"], str(d["factor"]["domain"])): d
+            for d in previous.get("debate_logs", [])
+        }
+        fingerprints = previous.get("debate_inputs", {})
+        reused: Dict[str, DebateTrace] = {}
+        for factor in factors:
+            old = by_factor.get((factor.description, factor.domain.value))
+            if old is None:
+                continue
+            same_inputs = fingerprints.get(old["factor_id"]) == self._debate_fingerprint(factor, context, retrieval)
+            if same_inputs or (self.reuse_untouched_debates and not diff.touches(factor)):
+                reused[factor.factor_id] = DebateTrace(
+                    **{**old, "factor_id": factor.factor_id, "factor": factor.dict()}
+                )
+        return reused
 
     def _calculate_confidence(self, debate_logs: List[DebateTrace], final_report: FinalReport) -> float:
         """Calculate confidence score based on debate analysis quality and balance."""
@@ -76,59 +435,98 @@ class AetherOrchestrator:
         avg_score = (total_score / factors_count) if factors_count > 0 else 0
         return round(min(avg_score, 100), 1)
 
-    async def analyze(self, context: ReasoningContext) -> Dict[str, Any]:
+    @staticmethod
+    @contextmanager
+    def _stage(name: str, stages: Dict[str, float]) -> Iterator[None]:
+        """Time a pipeline stage into `stages` (ms, for the session log) and the stage histogram."""
+        started = time.perf_counter()
         try:
-            # 1) Factor extraction
-            self._set_status("extracting", "Extracting factors")
-            print("\n[ORCHESTRATOR] Starting factor extraction...")
-            factors: List[Factor] = await self.factor_extractor.extract_factors(context)
-            print(f"[ORCHESTRATOR] Extracted {len(factors)} factors")
-            await asyncio.sleep(2)  # Rate limit prevention
-
-            # 2) For each factor → support then opposition
-            debate_logs: List[DebateTrace] = []
-            total_factors = len(factors)
-            for i, factor in enumerate(factors, 1):
-                print(f"\n[ORCHESTRATOR] Processing factor {i}/{total_factors}: {factor.factor_id}")
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            stages[name] = round(elapsed * 1000, 1)
+            get_metrics().observe("aether_stage_seconds", elapsed, stage=name)
 
-                self._set_status(
-                    "support",
-                    f"Generating support for {factor.factor_id}",
-                    factor_index=i,
-                    factor_total=total_factors,
-                    factor_id=factor.factor_id,
-                )
-                print(f"  → Generating support arguments...")
-                support: SupportArguments = await self.support_agent.generate_support(factor, context)
-                print(f"  → Support generated: {len(support.support_arguments)} arguments")
-                await asyncio.sleep(2)  # Rate limit prevention
+    async def analyze(
+        self,
+        context: ReasoningContext,
+        on_event: Optional[EventCallback] = None,
+        job: Optional[AnalysisJob] = None,
+        previous_session_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run the full pipeline; `on_event` gets factors, each debate and the final report as they land.
 
-                self._set_status(
-                    "opposition",
-                    f"Generating opposition for {factor.factor_id}",
-                    factor_index=i,
-                    factor_total=total_factors,
-                    factor_id=factor.factor_id,
-                )
-                print(f"  → Generating opposition arguments...")
-                opposition: OppositionCounterArguments = await self.opposition_agent.generate_counters(
-                    factor, support
+        With `previous_session_id` the context is diffed against that session's: its
+        factors are kept unless the narrative changed, and only debates the edits touch
+        are rerun before a fresh synthesis.
+        """
+        calls: List[Dict[str, Any]] = []
+        calls_token = call_records.set(calls)
+        stages: Dict[str, float] = {}
+        try:
+            previous: Optional[Dict[str, Any]] = None
+            diff: Optional[ContextDiff] = None
+            if previous_session_id:
+                previous = await self._load_previous(previous_session_id)
+                diff = diff_contexts(previous.get("input_context", {}), context)
+                print(
+                    f"[ORCHESTRATOR] Incremental run from {previous_session_id}: narrative "
+                    f"{'changed' if diff.narrative_changed else 'unchanged'}, "
+                    f"+{len(diff.added)}/-{len(diff.removed)} items"
                 )
-                print(f"  → Opposition generated: {len(opposition.counter_arguments)} arguments")
-                await asyncio.sleep(2)  # Rate limit prevention
 
-                debate = DebateTrace(
-                    factor_id=factor.factor_id,
-                    factor=factor,
-                    support=support,
-                    opposition=opposition,
-                )
-                debate_logs.append(debate)
+            # 0) Bound prompt size for large documents
+            with self._stage("compaction", stages):
+                views, compaction_stats, retrieval = await self._compact_context(context, job)
+
+            # 1) Factor extraction
+            if diff is not None and not diff.narrative_changed and previous.get("factors"):
+                factors: List[Factor] = [Factor(**f) for f in previous["factors"]]
+                print(f"[ORCHESTRATOR] Reusing {len(factors)} factors from {previous_session_id}")
+            else:
+                self._set_status("extracting", "Extracting factors", job)
+                print("\n[ORCHESTRATOR] Starting factor extraction...")
+                with self._stage("extractor", stages):
+                    factors = await self.factor_extractor.extract_factors(views["extractor"])
+                print(f"[ORCHESTRATOR] Extracted {len(factors)} factors")
+            await self._emit(on_event, "factors", {"factors": [f.dict() for f in factors]})
+
+            # 2) For each factor → support then opposition (fanned out, bounded)
+            total_factors = len(factors)
+            reused: Dict[str, DebateTrace] = {}
+            if previous is not None:
+                reused = self._reusable_debates(previous, diff, factors, views["support"], retrieval)
+                for i, debate in enumerate(reused.values(), 1):
+                    await self._emit(
+                        on_event,
+                        "debate",
+                        {"index": i, "total": len(reused), "reused": True, "debate": debate.dict()},
+                    )
+                if reused:
+                    get_metrics().inc("aether_debates_reused_total", len(reused))
+                print(f"[ORCHESTRATOR] Reusing debates for {sorted(reused)}")
+            pending = [f for f in factors if f.factor_id not in reused]
+            fresh: List[DebateTrace] = []
+            with self._stage("debates", stages):
+                if pending and self.batched_debates:
+                    fresh = await self._run_debates_batched(pending, views["support"], on_event, job, retrieval)
+                elif pending:
+                    fresh = await self._run_debates(pending, views["support"], on_event, job, retrieval)
+            fresh_by_id = {d.factor_id: d for d in fresh}
+            debate_logs: List[DebateTrace] = [reused.get(f.factor_id) or fresh_by_id[f.factor_id] for f in factors]
+            debate_inputs = {
+                f.factor_id: self._debate_fingerprint(f, views["support"], retrieval) for f in factors
+            }
+            if retrieval is not None and retrieval.selections:
+                compaction_stats["retrieval"] = retrieval.selections
 
             # 3) Synthesis
-            self._set_status("synthesizing", "Synthesizing final report")
+            self._set_status("synthesizing", "Synthesizing final report", job)
             print("\n[ORCHESTRATOR] Starting synthesis...")
-            final_report: FinalReport = await self.synthesizer_agent.generate_report(context, debate_logs)
+            with self._stage("synthesizer", stages):
+                final_report: FinalReport = await self.synthesizer_agent.generate_report(
+                    views["synthesis"], debate_logs
+                )
             print("[ORCHESTRATOR] Synthesis complete")
 
             # Calculate confidence score based on debate balance
@@ -136,31 +534,59 @@ class AetherOrchestrator:
             final_report.confidence_score = confidence_score
 
             # 4) Persist logs (structured, readable)
+            session_id = job.job_id if job is not None else uuid.uuid4().hex
             session_log: Dict[str, Any] = {
+                "session_id": session_id,
                 "timestamp": datetime.utcnow().isoformat() + "Z",
+                "context_hash": hash_text(context.model_dump_json()),
                 "input_context": context.dict(),
+                "compaction": compaction_stats,
                 "factors": [f.dict() for f in factors],
                 "debate_logs": [d.dict() for d in debate_logs],
+                "debate_inputs": debate_inputs,
                 "final_report": final_report.dict(),
+                "instrumentation": {
+                    "stages_ms": stages,
+                    "agents": summarize_calls(calls),
+                    "llm_calls": calls,
+                },
             }
-            ReasoningLogger.save_session(session_log, self.log_file)
+            incremental: Optional[Dict[str, Any]] = None
+            if previous is not None:
+                incremental = {
+                    "previous_session_id": previous_session_id,
+                    "diff": diff.summary(),
+                    "reused_factors": [f.factor_id for f in factors if f.factor_id in reused],
+                    "recomputed_factors": [f.factor_id for f in pending],
+                }
+                session_log["incremental"] = incremental
+            self.reasoning_logger.log(session_log)
+            await asyncio.to_thread(self.session_store.add, session_log)
 
             self._set_status(
                 "done",
                 "Analysis complete",
+                job,
                 factor_total=total_factors,
             )
 
             response_payload = {
+                "session_id": session_id,
                 "final_report": final_report.dict(),
                 "factors": [f.dict() for f in factors],
                 "debate_logs": [d.dict() for d in debate_logs],
             }
-            self.last_result = response_payload
-            self.last_narrative = context.narrative
+            if incremental is not None:
+                response_payload["incremental"] = incremental
+            await self._emit(on_event, "final_report", {"final_report": response_payload["final_report"]})
+
+            get_metrics().inc("aether_analyses_total", outcome="ok")
 
             # 5) API response
             return response_payload
         except Exception as exc:
-            self._set_status("error", f"Error: {exc}")
+            get_metrics().inc("aether_analyses_total", outcome="error")
+            self._set_status("error", f"Error: {exc}", job)
             raise
+        finally:
+            call_records.reset(calls_token)
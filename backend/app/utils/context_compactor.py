@@ -0,0 +1,303 @@
+"""Shrink large reasoning contexts to a per-agent token budget before prompting."""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.schemas.context import Metric, ReasoningContext
+from app.utils.llm_client import estimate_tokens
+
+
+_WORD = re.compile(r"[a-z][a-z0-9]+")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+# "Page 3", "page 3 of 12", "3 of 12", "3/12"; a bare number may be a table cell and is kept
+_PAGE_MARKER = re.compile(r"^(page\s*#(\s*(of|/)\s*#)?|#\s*(of|/)\s*#)$")
+# Page references inside otherwise identical header/footer lines ("ACME Corp | Page 3")
+_PAGE_REF = re.compile(r"\bpage\s*\d+(\s*(of|/)\s*\d+)?|\b\d+\s*(of|/)\s*\d+\b")
+_HEADER_WORD = re.compile(r"[a-z]{4,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+# Marks omitted stretches of the narrative so the model does not assume continuity
+_GAP_MARKER = "[...]"
+# Part of a view's budget kept for the narrative when facts and metrics alone would fill it
+_NARRATIVE_SHARE = 0.25
+
+_STOPWORDS = frozenset(
+    "the and for with that this from are was were has have had not but its our their "
+    "which will been than into over per also more less all any can may "
+    "in of to on at by as is it or an be if so after before about".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _WORD.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def stitch_chunks(chunks: List[str], selected: List[int]) -> str:
+    """Join the selected chunks in document order, marking every omitted stretch."""
+    parts: List[str] = []
+    previous: Optional[int] = None
+    for index in sorted(selected):
+        if (previous is None and index != 0) or (previous is not None and index != previous + 1):
+            parts.append(_GAP_MARKER)
+        parts.append(chunks[index])
+        previous = index
+    if previous != len(chunks) - 1:
+        parts.append(_GAP_MARKER)
+    return "\n".join(parts)
+
+
+def chunk_cost(chunk: str) -> int:
+    # Measure the JSON-escaped form, since that is what lands in the prompt
+    return estimate_tokens(json.dumps(chunk + "\n" + _GAP_MARKER, ensure_ascii=False))
+
+
+def pack_chunks(chunks: List[str], ranked: List[int], remaining: int) -> Tuple[List[str], List[int]]:
+    """Chunks from `ranked` (best first) that fit `remaining` tokens.
+
+    The narrative is never reduced to a bare gap marker: when not even the best chunk
+    fits, its start is kept. Returns the (possibly truncated) chunk list and the selection.
+    """
+    selected: List[int] = []
+    for index in ranked:
+        cost = chunk_cost(chunks[index])
+        if cost <= remaining:
+            selected.append(index)
+            remaining -= cost
+    if not selected and ranked:
+        best = ranked[0]
+        chunks = list(chunks)
+        # ~3 characters per token leaves room for JSON escaping
+        chunks[best] = chunks[best][: max(remaining, 0) * 3].rstrip()
+        selected.append(best)
+    return chunks, selected
+
+
+def fit_base(base: ReasoningContext, token_budget: int) -> ReasoningContext:
+    """Trim a narrative-less context until it leaves the narrative its share of `token_budget`.
+
+    Trailing metrics go first, then trailing facts, limitations and assumptions, so
+    callers order each list most important first.
+    """
+    limit = token_budget - int(token_budget * _NARRATIVE_SHARE)
+    overflow = estimate_tokens(base.model_dump_json()) - limit
+    if overflow <= 0:
+        return base
+    metrics = list(base.metrics)
+    while overflow > 0 and metrics:
+        overflow -= estimate_tokens(metrics.pop().model_dump_json()) + 1
+    fields = {name: list(getattr(base, name)) for name in ("extracted_facts", "limitations", "assumptions")}
+    for items in fields.values():
+        while overflow > 0 and items:
+            overflow -= estimate_tokens(json.dumps(items.pop(), ensure_ascii=False)) + 1
+    dropped = [f"{len(base.metrics) - len(metrics)} metrics"] + [
+        f"{len(getattr(base, name)) - len(items)} {name}" for name, items in fields.items()
+    ]
+    print(f"[COMPACTOR] Structured fields over budget: dropped {', '.join(dropped)}")
+    return base.model_copy(update={"metrics": metrics, **fields})
+
+
+@dataclass
+class PreparedContext:
+    """Narrative chunks with relevance scores, computed once and shared by every view."""
+
+    context: ReasoningContext
+    chunks: List[str]
+    scores: List[float]
+    metric_facts: List[str]
+    original_tokens: int
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+
+class ContextCompactor:
+    """Chunk, de-boilerplate, rank and budget a ReasoningContext.
+
+    Repeated page headers/footers and "Page N (of M)" lines are dropped, the narrative
+    is packed into chunks of roughly `chunk_chars`, and chunks are ranked by how
+    many of the document's recurring terms (and figures) they contain. When there
+    are more than `max_metrics` table metrics they are replaced by one summary
+    line per metric name. Each view then keeps the highest-ranked chunks that fit
+    its token budget, in original document order.
+    """
+
+    def __init__(self, chunk_chars: int = 1200, max_metrics: int = 60, min_repeats: int = 3) -> None:
+        self.chunk_chars = chunk_chars
+        self.max_metrics = max_metrics
+        self.min_repeats = min_repeats
+
+    # -- preparation -----------------------------------------------------
+
+    @staticmethod
+    def _line_key(line: str) -> str:
+        return _NUMBER.sub("#", line.strip().lower())
+
+    @staticmethod
+    def _repeat_key(line: str) -> str:
+        # Only page references vary between copies of a header/footer; other figures must
+        # match exactly, so repeated table values ("$2.0M", "Q3 2025") are not collapsed
+        return _PAGE_REF.sub("#", line.strip().lower())
+
+    def strip_boilerplate(self, text: str) -> Tuple[str, int]:
+        """Drop page markers and repeated short header/footer lines (first occurrence kept)."""
+        lines = text.splitlines()
+        keys = [self._repeat_key(line) for line in lines]
+        counts = Counter(keys)
+        seen = set()
+        kept: List[str] = []
+        dropped = 0
+        for line, key in zip(lines, keys):
+            if _PAGE_MARKER.match(self._line_key(line)):
+                dropped += 1
+                continue
+            # Table rows and cells repeat too, so only short lines with a real word count
+            boilerplate = (
+                counts[key] >= self.min_repeats
+                and len(key) <= 100
+                and len(_NUMBER.findall(line)) <= 2
+                and _HEADER_WORD.search(key) is not None
+            )
+            if boilerplate and key in seen:
+                dropped += 1
+                continue
+            seen.add(key)
+            kept.append(line)
+        return "\n".join(kept), dropped
+
+    def chunk(self, text: str) -> List[str]:
+        """Pack lines (or sentences of over-long lines) into chunks of ~chunk_chars."""
+        chunks: List[str] = []
+        current: List[str] = []
+        size = 0
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            pieces = [line] if len(line) <= self.chunk_chars else _SENTENCE_END.split(line)
+            for piece in pieces:
+                if current and size + len(piece) > self.chunk_chars:
+                    chunks.append("\n".join(current))
+                    current, size = [], 0
+                current.append(piece)
+                size += len(piece) + 1
+        if current:
+            chunks.append("\n".join(current))
+        return chunks
+
+    def rank(self, chunks: List[str]) -> List[float]:
+        """Score chunks by the document-level frequency of their terms, favouring figures."""
+        chunk_terms = [tokenize(c) for c in chunks]
+        doc_tf = Counter(t for terms in chunk_terms for t in terms)
+        scores = []
+        for text, terms in zip(chunks, chunk_terms):
+            salience = sum(math.log1p(doc_tf[t]) for t in set(terms)) / math.sqrt(len(terms) + 1)
+            numeric = len(_NUMBER.findall(text)) / (len(terms) + 1)
+            scores.append(salience * (1 + min(numeric, 1.0)))
+        if scores:
+            # The opening chunk is usually the title / executive summary
+            scores[0] = math.inf
+        return scores
+
+    def summarize_metrics(self, metrics: List[Metric]) -> List[str]:
+        """One line per metric name: count, total, mean and the min/max regions."""
+        groups: Dict[str, List[Metric]] = {}
+        for m in metrics:
+            groups.setdefault(m.name.strip() or "(unnamed)", []).append(m)
+
+        ordered = sorted(groups.items(), key=lambda item: len(item[1]), reverse=True)
+        facts = []
+        for name, items in ordered[: self.max_metrics]:
+            values = [m.value for m in items]
+            low = min(items, key=lambda m: m.value)
+            high = max(items, key=lambda m: m.value)
+            facts.append(
+                f"Metric {name}: {len(items)} values, total {sum(values):g}, "
+                f"mean {sum(values) / len(values):g}, min {low.value:g} ({low.region or 'n/a'}), "
+                f"max {high.value:g} ({high.region or 'n/a'})"
+            )
+        return facts
+
+    def prepare(self, context: ReasoningContext) -> PreparedContext:
+        cleaned, dropped_lines = self.strip_boilerplate(context.narrative)
+        chunks = self.chunk(cleaned)
+        summarize = len(context.metrics) > self.max_metrics
+        metric_facts = self.summarize_metrics(context.metrics) if summarize else []
+        return PreparedContext(
+            context=context,
+            chunks=chunks,
+            scores=self.rank(chunks),
+            metric_facts=metric_facts,
+            original_tokens=estimate_tokens(context.model_dump_json()),
+            stats={
+                "boilerplate_lines_dropped": dropped_lines,
+                "chunks": len(chunks),
+                "metrics_summarized": len(context.metrics) if summarize else 0,
+            },
+        )
+
+    # -- views -----------------------------------------------------------
+
+    def view(self, prepared: PreparedContext, token_budget: int) -> ReasoningContext:
+        """Best-ranked chunks that fit `token_budget`, stitched back in document order."""
+        original = prepared.context
+        if prepared.original_tokens <= token_budget:
+            return original
+
+        # Metric summaries are appended after the original facts, least frequent last, so
+        # they are trimmed before any extracted fact is
+        base = fit_base(
+            original.model_copy(
+                update={
+                    "narrative": "",
+                    "metrics": [] if prepared.metric_facts else original.metrics,
+                    "extracted_facts": original.extracted_facts + prepared.metric_facts,
+                }
+            ),
+            token_budget,
+        )
+        remaining = token_budget - estimate_tokens(base.model_dump_json())
+
+        ranked = sorted(range(len(prepared.chunks)), key=lambda i: prepared.scores[i], reverse=True)
+        chunks, selected = pack_chunks(prepared.chunks, ranked, remaining)
+        return base.model_copy(update={"narrative": stitch_chunks(chunks, selected)})
+
+    def compact(
+        self, context: ReasoningContext, budgets: Dict[str, int]
+    ) -> Tuple[Dict[str, ReasoningContext], Dict[str, Any]]:
+        """Build one view per agent name in `budgets`; also returns size stats for the session log."""
+        return self.build_views(self.prepare(context), budgets)
+
+    def build_views(
+        self, prepared: PreparedContext, budgets: Dict[str, int]
+    ) -> Tuple[Dict[str, ReasoningContext], Dict[str, Any]]:
+        views = {agent: self.view(prepared, budget) for agent, budget in budgets.items()}
+        stats = {
+            **prepared.stats,
+            "original_tokens": prepared.original_tokens,
+            "view_tokens": {
+                agent: estimate_tokens(view.model_dump_json()) for agent, view in views.items()
+            },
+        }
+        return views, stats
+
+
+def context_budgets_from_env() -> Dict[str, int]:
+    return {
+        "extractor": int(os.getenv("CONTEXT_TOKEN_BUDGET_EXTRACTOR", "8000")),
+        "support": int(os.getenv("CONTEXT_TOKEN_BUDGET_SUPPORT", "4000")),
+        "synthesis": int(os.getenv("CONTEXT_TOKEN_BUDGET_SYNTHESIS", "6000")),
+    }
+
+
+def context_compactor_from_env() -> Optional[ContextCompactor]:
+    """None when CONTEXT_COMPACTION is disabled, in which case agents see the full context."""
+    if os.getenv("CONTEXT_COMPACTION", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return ContextCompactor(
+        chunk_chars=int(os.getenv("CONTEXT_CHUNK_CHARS", "1200")),
+        max_metrics=int(os.getenv("CONTEXT_MAX_METRICS", "60")),
+    )
@@ -0,0 +1,77 @@
+"""Item-level diff between a stored session's context and a resubmitted one."""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple
+
+from app.schemas.context import ReasoningContext
+from app.schemas.factor import Factor
+from app.utils.retrieval import index_terms
+
+
+# Assumptions and limitations frame every argument in a prompt, so editing one bears on
+# every factor; facts and metrics only on the factors they are about
+_GLOBAL_KINDS = ("assumptions", "limitations")
+
+
+def _items(context: Dict[str, Any]) -> Counter:
+    """(kind, text) pairs for facts, assumptions, limitations and metrics (a multiset)."""
+    items: Counter = Counter()
+    for kind in ("extracted_facts",) + _GLOBAL_KINDS:
+        items.update((kind, text) for text in context.get(kind) or [])
+    for metric in context.get("metrics") or []:
+        region = f" ({metric.get('region')})" if metric.get("region") else ""
+        items[("metrics", f"{metric['name']}{region} = {float(metric['value']):g}")] += 1
+    return items
+
+
+@dataclass
+class ContextDiff:
+    narrative_changed: bool
+    added: List[Tuple[str, str]] = field(default_factory=list)
+    removed: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return self.narrative_changed or bool(self.added or self.removed)
+
+    @property
+    def global_change(self) -> bool:
+        """Whether the edits affect every factor's debate (narrative, assumptions or limitations)."""
+        return self.narrative_changed or any(kind in _GLOBAL_KINDS for kind, _ in self.added + self.removed)
+
+    def __post_init__(self) -> None:
+        # Terms of the item text only; the kind label would match any factor mentioning "metric"
+        self._terms: Set[str] = {t for _, text in self.added + self.removed for t in index_terms(text)}
+
+    def touches(self, factor: Factor) -> bool:
+        """Whether the edits could bear on `factor`.
+
+        Narrative, assumption and limitation edits may affect anything. Added or removed
+        facts and metrics only affect factors whose description shares a stemmed,
+        non-stopword term with them. This is a lexical guess, so callers only rely on it
+        when explicitly enabled.
+        """
+        if self.global_change:
+            return True
+        return bool(self._terms.intersection(index_terms(f"{factor.description} {factor.domain.value}")))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "narrative_changed": self.narrative_changed,
+            "added": [f"{kind}: {text}" for kind, text in self.added],
+            "removed": [f"{kind}: {text}" for kind, text in self.removed],
+        }
+
+
+def diff_contexts(previous: Dict[str, Any], current: ReasoningContext) -> ContextDiff:
+    """Diff a session's logged `input_context` against the new context."""
+    before = _items(previous)
+    after = _items(current.model_dump())
+    return ContextDiff(
+        narrative_changed=(previous.get("narrative") or "") != current.narrative,
+        added=sorted((after - before).elements()),
+        removed=sorted((before - after).elements()),
+    )
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.utils.jobs import AnalysisJob, JobRegistry
+
+
+JobRunner = Callable[[AnalysisJob], Awaitable[Any]]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 3)
+
+
+class JobQueue:
+    """In-process priority queue drained by a fixed pool of asyncio workers.
+
+    Higher `priority` runs first; equal priorities run in submission order.
+    The runner is responsible for recording the result/failure on the job.
+    """
+
+    def __init__(self, registry: JobRegistry, workers: int, max_queued: int) -> None:
+        self.registry = registry
+        self.workers = workers
+        self.max_queued = max_queued
+        self._queue: asyncio.PriorityQueue[Tuple[int, int, AnalysisJob, JobRunner]] = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._workers: List[asyncio.Task] = []
+        # (finished_at, wait_seconds, run_seconds) of recently completed jobs
+        self._completed: Deque[Tuple[float, float, float]] = deque(maxlen=500)
+        self.submitted = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in [*self._workers, *self._running.values()]:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job: AnalysisJob, runner: JobRunner, priority: int = 0) -> None:
+        """Enqueue a job; raises OverflowError when the queue is full."""
+        if self._queue.qsize() >= self.max_queued:
+            self.rejected += 1
+            raise OverflowError("Job queue is full")
+        self.submitted += 1
+        job.set_status("queued", "Queued", priority=priority)
+        self._queue.put_nowait((-priority, next(self._seq), job, runner))
+
+    def cancel(self, job: AnalysisJob) -> bool:
+        """Cancel a queued or running job; returns False if it already finished."""
+        if job.done:
+            return False
+        task = self._running.get(job.job_id)
+        if task is not None:
+            task.cancel()
+        # Queued jobs are skipped by the worker once flagged
+        self.registry.cancel(job)
+        return True
+
+    def position(self, job: AnalysisJob) -> Optional[int]:
+        """1-based position among queued jobs, or None if not queued."""
+        queued = sorted(
+            (entry for entry in self._queue._queue if not entry[2].done),  # heap snapshot
+            key=lambda entry: entry[:2],
+        )
+        for i, entry in enumerate(queued, 1):
+            if entry[2] is job:
+                return i
+        return None
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job, runner = await self._queue.get()
+            try:
+                if job.cancelled:
+                    continue
+                job.started_at = time.time()
+                task = asyncio.create_task(runner(job))
+                self._running[job.job_id] = task
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    if not job.cancelled:
+                        # The worker itself is shutting down
+                        raise
+                except Exception:
+                    # Runner already recorded the failure on the job
+                    pass
+                finally:
+                    self._running.pop(job.job_id, None)
+                    finished = time.time()
+                    self._completed.append(
+                        (finished, job.started_at - job.created_at, finished - job.started_at)
+                    )
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        recent = [c for c in self._completed if now - c[0] <= 300]
+        waits = [c[1] for c in self._completed]
+        runs = [c[2] for c in self._completed]
+        return {
+            "workers": self.workers,
+            "queued": sum(1 for entry in self._queue._queue if not entry[2].done),
+            "running": len(self._running),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": len(self._completed),
+            "throughput_per_min": round(len(recent) / 5, 2),
+            "wait_seconds": {"p50": _percentile(waits, 50), "p95": _percentile(waits, 95)},
+            "run_seconds": {"p50": _percentile(runs, 50), "p95": _percentile(runs, 95)},
+        }
+
+
+_shared_queue: Optional[JobQueue] = None
+
+
+def get_job_queue(registry: JobRegistry) -> JobQueue:
+    global _shared_queue
+    if _shared_queue is None:
+        _shared_queue = JobQueue(
+            registry,
+            workers=max(1, int(os.getenv("JOB_WORKERS", "2"))),
+            max_queued=int(os.getenv("JOB_QUEUE_MAX", "100")),
+        )
+    return _shared_queue
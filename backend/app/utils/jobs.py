@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class AnalysisJob:
+    """Isolated progress and result state for one analysis request."""
+
+    def __init__(self, kind: str) -> None:
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancelled = False
+        self.result: Dict[str, Any] | None = None
+        self.narrative: str | None = None
+        self.error: Optional[str] = None
+        self.result_bytes = 0
+        self.status: Dict[str, Any] = {}
+        self.set_status("pending", "Waiting to start")
+
+    def set_status(self, phase: str, message: str, **details: Any) -> None:
+        self.status = {
+            "phase": phase,
+            "message": message,
+            "updated_at": datetime.utcnow().isoformat() + "Z",
+            **details,
+        }
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @staticmethod
+    def _iso(ts: Optional[float]) -> Optional[str]:
+        return datetime.utcfromtimestamp(ts).isoformat() + "Z" if ts else None
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "created_at": self._iso(self.created_at),
+            "started_at": self._iso(self.started_at),
+            "finished_at": self._iso(self.finished_at),
+            "cancelled": self.cancelled,
+            "error": self.error,
+            **self.status,
+        }
+
+
+class JobRegistry:
+    """In-memory job table; finished jobs are evicted by TTL, count and total result size."""
+
+    def __init__(self, ttl_seconds: float, max_finished: int, max_result_bytes: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_finished = max_finished
+        self.max_result_bytes = max_result_bytes
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._latest_completed: Optional[str] = None
+        self.evicted = 0
+
+    def create(self, kind: str) -> AnalysisJob:
+        self._evict()
+        job = AnalysisJob(kind)
+        self._jobs[job.job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        self._evict()
+        return self._jobs.get(job_id)
+
+    def latest_completed(self) -> Optional[AnalysisJob]:
+        return self.get(self._latest_completed) if self._latest_completed else None
+
+    def finish(self, job: AnalysisJob, result: Dict[str, Any], narrative: str) -> None:
+        job.result = result
+        job.narrative = narrative
+        job.result_bytes = len(json.dumps(result, ensure_ascii=False))
+        job.finished_at = time.time()
+        job.set_status("done", "Analysis complete", factor_total=len(result.get("factors", [])))
+        self._latest_completed = job.job_id
+        self._evict()
+
+    def fail(self, job: AnalysisJob, error: str) -> None:
+        job.error = error
+        job.finished_at = time.time()
+        job.set_status("error", f"Error: {error}")
+        self._evict()
+
+    def cancel(self, job: AnalysisJob) -> None:
+        job.cancelled = True
+        job.error = "Cancelled"
+        job.finished_at = time.time()
+        job.set_status("cancelled", "Cancelled")
+        self._evict()
+
+    def _evict(self) -> None:
+        now = time.time()
+        finished = [j for j in self._jobs.values() if j.done]
+        expired = [j for j in finished if now - j.finished_at > self.ttl_seconds]
+        for job in expired:
+            self._drop(job)
+
+        # Oldest finished jobs go first once over the count or memory cap
+        finished = [j for j in finished if j.job_id in self._jobs]
+        finished.sort(key=lambda j: j.finished_at)
+        total_bytes = sum(j.result_bytes for j in finished)
+        while finished and (len(finished) > self.max_finished or total_bytes > self.max_result_bytes):
+            job = finished.pop(0)
+            total_bytes -= job.result_bytes
+            self._drop(job)
+
+    def _drop(self, job: AnalysisJob) -> None:
+        del self._jobs[job.job_id]
+        self.evicted += 1
+        if self._latest_completed == job.job_id:
+            self._latest_completed = None
+
+    def stats(self) -> Dict[str, Any]:
+        jobs = list(self._jobs.values())
+        return {
+            "active": sum(1 for j in jobs if not j.done),
+            "finished": sum(1 for j in jobs if j.done),
+            "result_bytes": sum(j.result_bytes for j in jobs),
+            "evicted": self.evicted,
+        }
+
+
+_shared_registry: Optional[JobRegistry] = None
+
+
+def get_job_registry() -> JobRegistry:
+    global _shared_registry
+    if _shared_registry is None:
+        _shared_registry = JobRegistry(
+            ttl_seconds=float(os.getenv("JOB_TTL_SECONDS", "3600")),
+            max_finished=int(os.getenv("JOB_MAX_FINISHED", "200")),
+            max_result_bytes=int(os.getenv("JOB_MAX_RESULT_BYTES", str(50 * 1024 * 1024))),
+        )
+    return _shared_registry
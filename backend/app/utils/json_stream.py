@@ -0,0 +1,141 @@
+"""Incremental extraction of array items from a JSON object that is still streaming in."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, List, Optional
+
+
+class MalformedStreamError(ValueError):
+    """The partial output can no longer become the expected JSON object."""
+
+
+class InvalidElementError(MalformedStreamError):
+    """One array element is not a valid JSON object; the rest of the stream can still be parsed.
+
+    `items` holds the elements that closed before it in the same `feed` call; feeding
+    more text (or "") resumes after the bad element.
+    """
+
+    def __init__(self, message: str, items: List[Any]) -> None:
+        super().__init__(message)
+        self.items = items
+
+
+# Models sometimes wrap JSON in a ```json fence; allow that much preamble and no more
+_MAX_PREAMBLE = 32
+_PREAMBLE_CHARS = frozenset(" \t\r\n`json")
+
+
+class StreamingArrayParser:
+    """Feed text chunks of `{"<key>": [ {...}, {...} ], ...}`; get each element once it closes.
+
+    Only the structure needed to find element boundaries is tracked (string/escape
+    state and the bracket stack), so feeding is linear in the output size. Raises
+    MalformedStreamError as soon as the output cannot be the expected object:
+    prose before the opening brace, or mismatched brackets. An element that is not a
+    JSON object raises InvalidElementError once it ends.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._target_depth: Optional[int] = None
+        self._item_start: Optional[int] = None
+        # Start of an array element that is not an object (string, number, array, literal)
+        self._stray_start: Optional[int] = None
+        self._started = False
+        self.done = False
+
+    def _at_element_start(self) -> bool:
+        return (
+            self._target_depth is not None
+            and len(self._stack) == self._target_depth
+            and self._item_start is None
+            and self._stray_start is None
+        )
+
+    def _stray_error(self, end: int, items: List[Any]) -> InvalidElementError:
+        element = self.text[self._stray_start:end].strip()
+        self._stray_start = None
+        return InvalidElementError(f"Array element is not an object: {element[:40]!r}", items)
+
+    def feed(self, chunk: str) -> List[Any]:
+        self.text += chunk
+        items: List[Any] = []
+        text = self.text
+        while self._pos < len(text):
+            ch = text[self._pos]
+            pos = self._pos
+            self._pos += 1
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._stack.append("{")
+                elif pos >= _MAX_PREAMBLE or ch not in _PREAMBLE_CHARS:
+                    raise MalformedStreamError(f"Expected a JSON object, got {text[:40]!r}")
+                continue
+            if self.done:
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        # A string directly inside the root object; the next one after ':' is a value
+                        self._last_key = text[self._string_start:pos]
+                continue
+
+            if ch == '"':
+                if self._at_element_start():
+                    self._stray_start = pos
+                self._in_string = True
+                self._string_start = pos + 1
+            elif ch in "{[":
+                if ch == "[" and len(self._stack) == 1 and self._last_key == self.key:
+                    self._target_depth = 2
+                elif self._at_element_start():
+                    if ch == "{":
+                        self._item_start = pos
+                    else:
+                        self._stray_start = pos
+                self._stack.append(ch)
+            elif ch in "}]":
+                expected = "{" if ch == "}" else "["
+                if not self._stack or self._stack[-1] != expected:
+                    raise MalformedStreamError(f"Unbalanced {ch!r} at offset {pos}")
+                self._stack.pop()
+                if (
+                    ch == "}"
+                    and self._item_start is not None
+                    and self._target_depth is not None
+                    and len(self._stack) == self._target_depth
+                ):
+                    start, self._item_start = self._item_start, None
+                    try:
+                        items.append(json.loads(text[start:pos + 1]))
+                    except json.JSONDecodeError as e:
+                        raise InvalidElementError(f"Invalid array element: {e}", items)
+                elif ch == "]" and self._target_depth is not None and len(self._stack) == 1:
+                    self._target_depth = None
+                    if self._stray_start is not None:
+                        raise self._stray_error(pos, items)
+                if not self._stack:
+                    self.done = True
+            elif self._target_depth is not None and len(self._stack) == self._target_depth:
+                if ch == "," and self._stray_start is not None:
+                    raise self._stray_error(pos, items)
+                if ch != "," and not ch.isspace() and self._at_element_start():
+                    self._stray_start = pos
+        return items
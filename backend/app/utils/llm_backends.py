@@ -0,0 +1,498 @@
+"""Interchangeable text-generation backends behind LLMClient.
+
+`GeminiBackend` talks to Vertex AI. `FakeBackend` needs no network or credentials:
+it returns schema-valid JSON for every agent with a configurable latency and
+failure distribution, for benchmarks and offline development.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+class LLMBackend:
+    """Returns an object with `.text` and (optionally) Gemini-style `.usage_metadata`.
+
+    Raised exceptions go through LLMClient's retry policy, so backends should raise
+    `google.genai.errors.APIError` (or ConnectionError / TimeoutError) for transient failures.
+    `prefix`, when given, is a leading part of `prompt` that other calls share (e.g. the
+    support template and context across one analysis' factors); backends may serve it
+    from a context cache instead of sending it again.
+    """
+
+    name = "base"
+
+    async def generate(
+        self, model: str, prompt: str, config: Dict[str, Any], agent: str, prefix: Optional[str] = None
+    ) -> Any:
+        raise NotImplementedError
+
+    async def stream(
+        self, model: str, prompt: str, config: Dict[str, Any], agent: str, prefix: Optional[str] = None
+    ) -> AsyncIterator[Any]:
+        """Yield partial responses (`.text` deltas); the last one may carry `.usage_metadata`.
+
+        Backends without native streaming yield the whole response once.
+        """
+        yield await self.generate(model, prompt, config, agent, prefix)
+
+    def caches_prefix(self, tokens: int) -> bool:
+        """Whether a shared prefix of about `tokens` tokens would be served from a context cache."""
+        return False
+
+    async def aclose(self) -> None:
+        """Release pooled connections (called on app shutdown)."""
+
+
+class GeminiBackend(LLMBackend):
+    """Vertex AI via the SDK's native async client (`client.aio`).
+
+    All calls share one keep-alive HTTP connection pool on the event loop, so
+    concurrency is bounded by the pool size and the rate limiter rather than by
+    executor threads. Each call is bounded by `timeout_seconds`. The SDK import and
+    client (credential discovery) are deferred to the first call, off the event loop.
+
+    With `context_cache`, a shared prompt prefix seen a second time within
+    `context_cache_ttl_seconds` is uploaded in the background as an explicit context
+    cache; calls made once it exists send only the remainder, so the prefix tokens are
+    billed at the cached rate. No call waits for the upload.
+    Prefixes under `context_cache_min_tokens` (2048 is Gemini 2.5 Pro's minimum on
+    Vertex AI) are always sent inline, and any caching failure falls back to the full prompt.
+    """
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        timeout_seconds: float = 120.0,
+        max_connections: int = 64,
+        keepalive_seconds: float = 60.0,
+        context_cache: bool = True,
+        context_cache_min_tokens: int = 2048,
+        context_cache_ttl_seconds: float = 300.0,
+    ) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.max_connections = max_connections
+        self.keepalive_seconds = keepalive_seconds
+        self.context_cache = context_cache
+        self.context_cache_min_tokens = context_cache_min_tokens
+        self.context_cache_ttl_seconds = context_cache_ttl_seconds
+        self._client: Optional[Any] = None
+        self._client_lock = asyncio.Lock()
+        # prefix key -> task resolving to (cache name or None after a failure, expiry on the monotonic clock)
+        self._context_caches: Dict[str, asyncio.Task] = {}
+        # prefix key -> when it was last sent inline
+        self._prefixes_seen: Dict[str, float] = {}
+
+    def _create_client(self) -> Any:
+        import httpx
+        from google import genai
+        from google.genai import types
+
+        # Used by the SDK's httpx transport (aiohttp, if installed, manages its own pool)
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=self.keepalive_seconds,
+        )
+        # Use Vertex AI with ADC (Application Default Credentials)
+        return genai.Client(
+            vertexai=True,
+            project=os.getenv("GCP_PROJECT"),
+            location=os.getenv("GCP_LOCATION", "us-central1"),
+            http_options=types.HttpOptions(
+                timeout=int(self.timeout_seconds * 1000),
+                async_client_args={"limits": limits},
+            ),
+        )
+
+    async def _get_client(self) -> Any:
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    # ADC discovery can block for seconds (e.g. probing the metadata server)
+                    self._client = await asyncio.to_thread(self._create_client)
+        return self._client
+
+    # -- context caching ---------------------------------------------------
+
+    def caches_prefix(self, tokens: int) -> bool:
+        return self.context_cache and tokens >= self.context_cache_min_tokens
+
+    def _prefix_key(self, model: str, prompt: str, prefix: Optional[str]) -> Optional[str]:
+        # ~4 characters per token, as in LLMClient
+        if not prefix or not self.caches_prefix(len(prefix) // 4) or not prompt.startswith(prefix):
+            return None
+        return hashlib.sha256(f"{model}\n{prefix}".encode("utf-8")).hexdigest()
+
+    async def _create_cache(self, client: Any, model: str, prefix: str) -> Tuple[Optional[str], float]:
+        from google.genai import types
+
+        ttl = self.context_cache_ttl_seconds
+        try:
+            cache = await asyncio.wait_for(
+                client.aio.caches.create(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        contents=prefix, ttl=f"{int(ttl)}s", display_name="aether-prompt-prefix"
+                    ),
+                ),
+                timeout=self.timeout_seconds,
+            )
+        except Exception as e:
+            # Not retried for this prefix until the TTL passes; calls send the full prompt meanwhile
+            print(f"[LLM] Context cache unavailable, sending full prompts: {e}")
+            return None, time.monotonic() + ttl
+        # Stop using the cache a little before the server expires it
+        return cache.name, time.monotonic() + ttl * 0.9
+
+    def _prune_caches(self, now: float) -> None:
+        for key, task in list(self._context_caches.items()):
+            if task.done() and (task.cancelled() or task.result()[1] <= now):
+                del self._context_caches[key]
+        for key, seen in list(self._prefixes_seen.items()):
+            if now - seen > self.context_cache_ttl_seconds:
+                del self._prefixes_seen[key]
+
+    async def _cached_content(self, client: Any, model: str, prefix: str, key: str) -> Optional[str]:
+        """Name of the context cache holding `prefix`, or None to send it inline."""
+        now = time.monotonic()
+        self._prune_caches(now)
+        task = self._context_caches.get(key)
+        if task is None:
+            seen = self._prefixes_seen.pop(key, None)
+            if seen is None:
+                # One-off prefixes are cheaper to send than to cache; wait for a second use
+                self._prefixes_seen[key] = now
+                return None
+            task = asyncio.ensure_future(self._create_cache(client, model, prefix))
+            self._context_caches[key] = task
+        if not task.done() or task.cancelled():
+            # The upload runs in the background; calls made meanwhile send the prefix inline
+            return None
+        return task.result()[0]
+
+    async def _request(
+        self, client: Any, model: str, prompt: str, config: Dict[str, Any], prefix: Optional[str]
+    ) -> Tuple[str, Dict[str, Any], Optional[str]]:
+        """Contents and config for a call, with `prefix` replaced by its context cache when there is one."""
+        key = self._prefix_key(model, prompt, prefix)
+        name = await self._cached_content(client, model, prefix, key) if key else None
+        if name is None:
+            return prompt, config, None
+        return prompt[len(prefix):], {**config, "cached_content": name}, key
+
+    def _cache_rejected(self, key: Optional[str], exc: Exception) -> bool:
+        """Whether a call failed because its context cache is gone (then retried inline)."""
+        genai_errors = sys.modules.get("google.genai.errors")
+        if key is None or genai_errors is None or not isinstance(exc, genai_errors.APIError):
+            return False
+        if exc.code not in (400, 403, 404):
+            return False
+        print(f"[LLM] Context cache rejected, resending full prompt: {exc}")
+        self._context_caches.pop(key, None)
+        return True
+
+    # -- calls ---------------------------------------------------------------
+
+    async def generate(
+        self, model: str, prompt: str, config: Dict[str, Any], agent: str, prefix: Optional[str] = None
+    ) -> Any:
+        client = await self._get_client()
+        contents, request_config, key = await self._request(client, model, prompt, config, prefix)
+        try:
+            # The SDK timeout covers the HTTP exchange; wait_for also bounds token refresh and
+            # surfaces as a (retryable) TimeoutError
+            return await asyncio.wait_for(
+                client.aio.models.generate_content(model=model, contents=contents, config=request_config),
+                timeout=self.timeout_seconds,
+            )
+        except Exception as exc:
+            if not self._cache_rejected(key, exc):
+                raise
+        return await asyncio.wait_for(
+            client.aio.models.generate_content(model=model, contents=prompt, config=config),
+            timeout=self.timeout_seconds,
+        )
+
+    async def stream(
+        self, model: str, prompt: str, config: Dict[str, Any], agent: str, prefix: Optional[str] = None
+    ) -> AsyncIterator[Any]:
+        client = await self._get_client()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        # `timeout_seconds` bounds the time spent waiting on the model, applied per await: a
+        # timeout scope left open across `yield` would keep running while the consumer holds
+        # the generator, and could cancel the consumer's task instead of this call
+        async with asyncio.timeout(self.timeout_seconds):
+            contents, request_config, key = await self._request(client, model, prompt, config, prefix)
+            try:
+                chunks = await client.aio.models.generate_content_stream(
+                    model=model, contents=contents, config=request_config
+                )
+            except Exception as exc:
+                if not self._cache_rejected(key, exc):
+                    raise
+                chunks = await client.aio.models.generate_content_stream(
+                    model=model, contents=prompt, config=config
+                )
+        remaining = self.timeout_seconds - (loop.time() - started)
+        iterator = chunks.__aiter__()
+        try:
+            while True:
+                started = loop.time()
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), max(0.0, remaining))
+                except StopAsyncIteration:
+                    return
+                remaining -= loop.time() - started
+                yield chunk
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _delete_caches(self, client: Any) -> None:
+        """Drop live context caches so they stop accruing storage until their TTL."""
+        tasks, self._context_caches = self._context_caches, {}
+        self._prefixes_seen.clear()
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+                continue
+            if task.cancelled() or task.result()[0] is None:
+                continue
+            try:
+                await client.aio.caches.delete(name=task.result()[0])
+            except Exception as e:
+                print(f"[LLM] Could not delete context cache: {e}")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await self._delete_caches(client)
+            await client.aio.aclose()
+
+
+_FACTOR_ID = re.compile(r'"factor_id"\s*:\s*"([^"]+)"')
+_WORD = re.compile(r"[A-Za-z][A-Za-z]{4,}")
+_DOMAINS = ("sales", "statistics", "policy", "organization")
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic offline stand-in for Gemini.
+
+    Response content depends only on the prompt, so identical prompts give identical
+    answers (and LLM cache behaviour matches production). Latency is log-normal around
+    `latency_ms`; `failure_rate` of calls raise a retryable 503 and `rate_limit_rate`
+    a 429, drawn from a seeded RNG. When streaming, `malformed_rate` of responses
+    start with prose instead of JSON. A `prefix` meeting the same `context_cache`
+    settings as GeminiBackend's is "uploaded" on its second use and reported as cached
+    tokens from the third on.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: float = 200.0,
+        latency_sigma: float = 0.3,
+        failure_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        factors: int = 4,
+        seed: int = 0,
+        stream_chunks: int = 8,
+        context_cache: bool = True,
+        context_cache_min_tokens: int = 2048,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.factors = factors
+        self.stream_chunks = stream_chunks
+        self.context_cache = context_cache
+        self.context_cache_min_tokens = context_cache_min_tokens
+        self._rng = random.Random(seed)
+        # prefix digest -> uses so far (capped at 2: seen, then cached)
+        self._prefixes: Dict[str, int] = {}
+        self.calls = 0
+
+    def _latency(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self._rng.lognormvariate(0.0, self.latency_sigma) * self.latency_ms / 1000
+
+    @staticmethod
+    def _error(code: int, status: str) -> Exception:
+        from google.genai import errors as genai_errors
+
+        return genai_errors.APIError(code, {"error": {"code": code, "status": status, "message": "fake backend"}})
+
+    def _maybe_fail(self) -> None:
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            raise self._error(429, "RESOURCE_EXHAUSTED")
+        if roll < self.rate_limit_rate + self.failure_rate:
+            raise self._error(503, "UNAVAILABLE")
+
+    def caches_prefix(self, tokens: int) -> bool:
+        return self.context_cache and tokens >= self.context_cache_min_tokens
+
+    def _cached_tokens(self, prefix: Optional[str]) -> Optional[int]:
+        if not prefix or not self.caches_prefix(len(prefix) // 4):
+            return None
+        key = self._digest(prefix)
+        uses = self._prefixes.get(key, 0)
+        if uses >= 2:
+            return len(prefix) // 4
+        if not uses and len(self._prefixes) >= 1024:
+            self._prefixes.pop(next(iter(self._prefixes)))
+        self._prefixes[key] = uses + 1
+        return None
+
+    @staticmethod
+    def _usage(prompt: str, text: str, cached: Optional[int] = None) -> SimpleNamespace:
+        return SimpleNamespace(
+            prompt_token_count=max(1, len(prompt) // 4),
+            candidates_token_count=max(1, len(text) // 4),
+            thoughts_token_count=None,
+            cached_content_token_count=cached,
+        )
+
+    async def generate(
+        self, model: str, prompt: str, config: Dict[str, Any], agent: str, prefix: Optional[str] = None
+    ) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self._latency())
+        self._maybe_fail()
+        text = json.dumps(self._respond(prompt, agent), separators=(",", ":"))
+        return SimpleNamespace(text=text, usage_metadata=self._usage(prompt, text, self._cached_tokens(prefix)))
+
+    async def stream(
+        self, model: str, prompt: str, config: Dict[str, Any], agent: str, prefix: Optional[str] = None
+    ) -> AsyncIterator[Any]:
+        self.calls += 1
+        latency = self._latency()
+        # Time to first token is a fraction of the total; the rest is spread over the chunks
+        await asyncio.sleep(latency * 0.3)
+        self._maybe_fail()
+        if self._rng.random() < self.malformed_rate:
+            text = "Sure! Here is the analysis you asked for: " + json.dumps(self._respond(prompt, agent))
+        else:
+            text = json.dumps(self._respond(prompt, agent), separators=(",", ":"))
+        cached = self._cached_tokens(prefix)
+        size = max(1, -(-len(text) // self.stream_chunks))
+        for start in range(0, len(text), size):
+            if start:
+                await asyncio.sleep(latency * 0.7 / self.stream_chunks)
+            last = start + size >= len(text)
+            yield SimpleNamespace(
+                text=text[start:start + size], usage_metadata=self._usage(prompt, text, cached) if last else None
+            )
+
+    # -- canned, schema-valid answers -------------------------------------
+
+    @staticmethod
+    def _digest(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+
+    def _topics(self, prompt: str) -> List[str]:
+        body = prompt.split("Context:", 1)[-1]
+        common = Counter(w.lower() for w in _WORD.findall(body)).most_common(self.factors)
+        return [w for w, _ in common] or ["performance"]
+
+    @staticmethod
+    def _support(tag: str) -> Dict[str, Any]:
+        return {"support_arguments": [
+            {"claim": f"Claim {i} [{tag}]", "evidence": f"Evidence {i} from context", "assumption": "Trend persists"}
+            for i in (1, 2)
+        ]}
+
+    @staticmethod
+    def _counters(tag: str) -> Dict[str, Any]:
+        return {"counter_arguments": [
+            {"target_claim": f"Claim {i} [{tag}]", "challenge": f"Challenge {i}", "risk": "Evidence may not generalize"}
+            for i in (1, 2)
+        ]}
+
+    def _respond(self, prompt: str, agent: str) -> Dict[str, Any]:
+        tag = self._digest(prompt)
+        batched = "For EACH factor" in prompt
+        if agent == "extractor":
+            topics = self._topics(prompt)
+            return {"factors": [
+                {"factor_id": f"F{i}", "description": f"Impact of {topic} on results", "domain": _DOMAINS[(i - 1) % 4]}
+                for i, topic in enumerate(topics, 1)
+            ]}
+        if agent == "support":
+            if batched:
+                return {fid: self._support(tag) for fid in dict.fromkeys(_FACTOR_ID.findall(prompt))}
+            return self._support(tag)
+        if agent == "opposition":
+            if batched:
+                return {fid: self._counters(tag) for fid in dict.fromkeys(_FACTOR_ID.findall(prompt))}
+            return self._counters(tag)
+        return {
+            "what_worked": f"What worked [{tag}]",
+            "what_failed": "What failed",
+            "why_it_happened": "Why it happened",
+            "how_to_improve": "How to improve",
+            "synthesis": "Synthesis",
+            "recommendation": "Recommendation",
+        }
+
+
+_shared_backend: Optional[LLMBackend] = None
+
+
+def get_llm_backend() -> LLMBackend:
+    """Backend shared by every LLMClient in this process (one connection pool, one client)."""
+    global _shared_backend
+    if _shared_backend is None:
+        _shared_backend = llm_backend_from_env()
+    return _shared_backend
+
+
+def _context_cache_settings() -> Dict[str, Any]:
+    # Read by the fake backend too, so benchmarks make the same caching decisions as Gemini
+    return {
+        "context_cache": os.getenv("GEMINI_CONTEXT_CACHE", "true").lower() in ("1", "true", "yes"),
+        "context_cache_min_tokens": int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "2048")),
+    }
+
+
+def llm_backend_from_env() -> LLMBackend:
+    provider = os.getenv("LLM_PROVIDER", "gemini").strip().lower()
+    if provider == "fake":
+        return FakeBackend(
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "200")),
+            latency_sigma=float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.3")),
+            failure_rate=float(os.getenv("FAKE_LLM_FAILURE_RATE", "0")),
+            rate_limit_rate=float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0")),
+            malformed_rate=float(os.getenv("FAKE_LLM_MALFORMED_RATE", "0")),
+            factors=int(os.getenv("FAKE_LLM_FACTORS", "4")),
+            seed=int(os.getenv("FAKE_LLM_SEED", "0")),
+            **_context_cache_settings(),
+        )
+    if provider != "gemini":
+        print(f"Warning: unknown LLM_PROVIDER '{provider}', using gemini")
+    return GeminiBackend(
+        timeout_seconds=float(os.getenv("LLM_TIMEOUT_SECONDS", "120")),
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "64")),
+        keepalive_seconds=float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "60")),
+        **_context_cache_settings(),
+        context_cache_ttl_seconds=float(os.getenv("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "300")),
+    )
@@ -3,40 +3,377 @@ from __future__ import annotations
 import asyncio
 import json
 import os
-import re
-from typing import Any, Dict, Optional
+import random
+import sys
+import time
+from contextlib import aclosing
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
-from google import genai
+from app.utils.json_stream import InvalidElementError, MalformedStreamError, StreamingArrayParser
+from app.utils.llm_backends import get_llm_backend
+from app.utils.llm_cache import cache_enabled, get_response_cache, make_cache_key
+from app.utils.metrics import call_records, get_metrics
+from app.utils.rate_limiter import get_rate_limiter
+
+
+# HTTP status codes worth retrying: quota exhaustion and transient server-side failures.
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+ItemCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+DEFAULT_SYSTEM_MESSAGE = "You are a meticulous analysis assistant. Respond with JSON only."
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token is close enough for budgeting purposes
+    return max(1, len(text) // 4)
 
 
 class LLMClient:
-    """Gemini client using Vertex AI (OAuth / ADC)."""
+    """LLM client with rate limiting, retries and caching over a pluggable backend.
+
+    The backend is Gemini on Vertex AI (OAuth / ADC) unless LLM_PROVIDER=fake.
+    """
 
     def __init__(self) -> None:
         self.model = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")
-        
-        # Use Vertex AI with ADC (Application Default Credentials)
-        self.client = genai.Client(
-            vertexai=True,
-            project=os.getenv("GCP_PROJECT"),
-            location=os.getenv("GCP_LOCATION", "us-central1"),
-        )
-
-    async def acompletion(self, prompt: str, system: Optional[str] = None) -> str:
-        system_msg = system or (
-            "You are a meticulous analysis assistant. Respond with JSON only."
-        )
+        self.backend = get_llm_backend()
+        self.generation_config: Dict[str, Any] = {"temperature": 0.2}
+        self.limiter = get_rate_limiter()
+        self.cache = get_response_cache()
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "5"))
+        self.backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+        self.backoff_max = float(os.getenv("LLM_BACKOFF_MAX", "60.0"))
+        # Stream list-shaped answers and validate each element as it arrives
+        self.streaming = os.getenv("LLM_STREAMING", "false").strip().lower() in ("1", "true", "yes")
+        self.max_stream_restarts = int(os.getenv("LLM_STREAM_MAX_RESTARTS", "2"))
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        return estimate_tokens(text)
+
+    @staticmethod
+    def _is_retryable(exc: Exception) -> bool:
+        genai_errors = sys.modules.get("google.genai.errors")
+        # The SDK is imported lazily; if it is not loaded, nothing could have raised its errors
+        if genai_errors is not None and isinstance(exc, genai_errors.APIError):
+            return exc.code in RETRYABLE_STATUS_CODES
+        return isinstance(exc, (asyncio.TimeoutError, ConnectionError, TimeoutError))
+
+    @staticmethod
+    def _retry_hint(exc: Exception) -> Optional[float]:
+        """Extract a server-provided retry delay (Retry-After header or google.rpc.RetryInfo)."""
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers:
+            retry_after = headers.get("retry-after")
+            if retry_after:
+                try:
+                    return float(retry_after)
+                except ValueError:
+                    pass
+
+        details = getattr(exc, "details", None)
+        if isinstance(details, dict):
+            for item in details.get("error", {}).get("details", []) or []:
+                delay = item.get("retryDelay") if isinstance(item, dict) else None
+                if isinstance(delay, str) and delay.endswith("s"):
+                    try:
+                        return float(delay[:-1])
+                    except ValueError:
+                        pass
+        return None
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_delay(self, exc: Exception, attempt: int) -> Optional[float]:
+        """Backoff before retry `attempt + 1`, or None when `exc` should propagate."""
+        if attempt >= self.max_retries or not self._is_retryable(exc):
+            return None
+        hint = self._retry_hint(exc)
+        delay = hint if hint is not None else self._backoff_delay(attempt)
+        if getattr(exc, "code", None) == 429:
+            # Quota pushback applies to every caller sharing the project
+            self.limiter.penalize(delay)
+        return delay
+
+    async def _generate(self, full_prompt: str, call: Dict[str, Any], prefix: Optional[str] = None) -> Any:
+        """Call Gemini under the shared rate limiter, retrying quota/transient errors.
+
+        Retry count is recorded on `call`.
+        """
+        estimated_tokens = self._estimate_tokens(full_prompt)
+        attempt = 0
+        while True:
+            await self.limiter.acquire(estimated_tokens)
+            try:
+                return await self.backend.generate(
+                    self.model, full_prompt, self.generation_config, call["agent"], prefix=prefix
+                )
+            except Exception as exc:
+                delay = self._retry_delay(exc, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                call["retries"] = attempt
+                print(f"[LLM] Retry {attempt}/{self.max_retries} in {delay:.1f}s after error: {exc}")
+                await asyncio.sleep(delay)
+
+    async def acompletion(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        use_cache: bool = True,
+        agent: str = "llm",
+        cache_prefix: Optional[str] = None,
+    ) -> str:
+        """`cache_prefix` is a leading part of `prompt` shared with other calls (see LLMBackend)."""
+        system_msg = system or DEFAULT_SYSTEM_MESSAGE
 
         full_prompt = f"{system_msg}\n\n{prompt}"
+        call: Dict[str, Any] = {
+            "agent": agent,
+            "prompt_chars": len(full_prompt),
+            "retries": 0,
+            "cache_hit": False,
+        }
+        started = time.perf_counter()
+
+        cache = self.cache if use_cache and cache_enabled.get() else None
+        cache_key = None
+        if cache is not None:
+            cache_key = make_cache_key(self.model, system_msg, full_prompt, self.generation_config)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                call.update(cache_hit=True, response_chars=len(cached))
+                self._record_call(call, started, "cache_hit")
+                return cached
+
+        try:
+            response = await self._generate(full_prompt, call, self._prefix(system_msg, cache_prefix))
+        except Exception as exc:
+            call["error"] = str(exc)[:200]
+            self._record_call(call, started, "error")
+            raise
+        text = response.text or ""
+        call.update(response_chars=len(text), **self._usage(response))
+        self._record_call(call, started, "ok")
+
+        if cache is not None and self._is_cacheable(text):
+            await cache.set(cache_key, text)
 
-        response = await asyncio.to_thread(
-            self.client.models.generate_content,
-            model=self.model,
-            contents=full_prompt,
-            config={"temperature": 0.2},
-        )
+        return text
+
+    async def astream_items(
+        self,
+        prompt: str,
+        item_key: str,
+        on_item: ItemCallback,
+        system: Optional[str] = None,
+        use_cache: bool = True,
+        agent: str = "llm",
+        cache_prefix: Optional[str] = None,
+    ) -> str:
+        """Stream a `{item_key: [...]}` answer, awaiting `on_item` for each element as it closes.
+
+        `on_item` validates the element and may raise ValueError (e.g. a pydantic
+        ValidationError) to reject it. Output that goes wrong before any element was
+        accepted - prose instead of JSON, broken brackets, an invalid element - aborts
+        the stream and restarts the call. On the last allowed attempt the answer is read
+        to the end instead and parsed with `parse_json`, which tolerates prose around the
+        JSON. Once elements were accepted, invalid elements are skipped, and broken
+        structure keeps what was accepted and drops the rest. Returns the streamed text;
+        only complete, parseable answers are cached, and cache hits replay their elements.
+        """
+        system_msg = system or DEFAULT_SYSTEM_MESSAGE
+
+        full_prompt = f"{system_msg}\n\n{prompt}"
+        call: Dict[str, Any] = {
+            "agent": agent,
+            "prompt_chars": len(full_prompt),
+            "retries": 0,
+            "cache_hit": False,
+            "streamed": True,
+        }
+        started = time.perf_counter()
+
+        cache = self.cache if use_cache and cache_enabled.get() else None
+        cache_key = None
+        if cache is not None:
+            cache_key = make_cache_key(self.model, system_msg, full_prompt, self.generation_config)
+            cached = await cache.get(cache_key)
+            if cached is not None:
+                call.update(cache_hit=True, response_chars=len(cached))
+                self._record_call(call, started, "cache_hit")
+                for raw in self._parsed_items(cached, item_key):
+                    await on_item(raw)
+                return cached
+
+        estimated_tokens = self._estimate_tokens(full_prompt)
+        prefix = self._prefix(system_msg, cache_prefix)
+        attempt = restarts = skipped = 0
+        complete = True
+        while True:
+            await self.limiter.acquire(estimated_tokens)
+            parser = StreamingArrayParser(item_key)
+            delivered = 0
+            last = None
+            # Set once the parser gives up on the last allowed attempt: the rest is read for parse_json
+            buffered: Optional[List[str]] = None
+
+            async def accept(raws: List[Any]) -> None:
+                nonlocal delivered, skipped
+                for raw in raws:
+                    try:
+                        await on_item(raw)
+                    except ValueError as exc:
+                        if not delivered:
+                            raise
+                        skipped += 1
+                        print(f"[LLM] Skipping invalid streamed element of {item_key}: {exc}")
+                        continue
+                    delivered += 1
+                    if delivered == 1:
+                        call["first_item_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+            async def consume(text: str) -> None:
+                nonlocal skipped
+                while True:
+                    try:
+                        await accept(parser.feed(text))
+                        return
+                    except InvalidElementError as exc:
+                        await accept(exc.items)
+                        if not delivered:
+                            raise
+                        skipped += 1
+                        print(f"[LLM] Skipping invalid streamed element of {item_key}: {exc}")
+                        # The parser resumes after the bad element
+                        text = ""
+
+            try:
+                stream = self.backend.stream(
+                    self.model, full_prompt, self.generation_config, agent, prefix=prefix
+                )
+                async with aclosing(stream):
+                    async for chunk in stream:
+                        last = chunk
+                        if buffered is not None:
+                            buffered.append(chunk.text or "")
+                            continue
+                        try:
+                            await consume(chunk.text or "")
+                        except ValueError:
+                            if delivered or restarts < self.max_stream_restarts:
+                                raise
+                            buffered = [parser.text]
+                if buffered is None and not parser.done:
+                    if delivered or restarts < self.max_stream_restarts:
+                        raise MalformedStreamError("Stream ended before the JSON object closed")
+                    buffered = [parser.text]
+                if buffered is not None:
+                    print(f"[LLM] Streamed {item_key} malformed after {restarts} restarts; parsing the full answer")
+                    call["parsed_fallback"] = True
+                    await accept(self._parsed_items("".join(buffered), item_key))
+                break
+            except ValueError as exc:
+                if delivered:
+                    complete = False
+                    call["truncated"] = True
+                    print(f"[LLM] Keeping {delivered} streamed {item_key} after malformed output: {exc}")
+                    break
+                if restarts >= self.max_stream_restarts:
+                    call["error"] = str(exc)[:200]
+                    self._record_call(call, started, "error")
+                    raise
+                restarts += 1
+                call["restarts"] = restarts
+                print(f"[LLM] Restarting stream {restarts}/{self.max_stream_restarts} after malformed output: {exc}")
+            except Exception as exc:
+                delay = None if delivered else self._retry_delay(exc, attempt)
+                if delay is None:
+                    call["error"] = str(exc)[:200]
+                    self._record_call(call, started, "error")
+                    raise
+                attempt += 1
+                call["retries"] = attempt
+                print(f"[LLM] Retry {attempt}/{self.max_retries} in {delay:.1f}s after error: {exc}")
+                await asyncio.sleep(delay)
+
+        text = "".join(buffered) if buffered is not None else parser.text
+        if skipped:
+            call["skipped_items"] = skipped
+        call.update(response_chars=len(text), **self._usage(last))
+        self._record_call(call, started, "ok")
+
+        if cache is not None and complete and self._is_cacheable(text):
+            await cache.set(cache_key, text)
+
+        return text
+
+    def caches_prefix(self, cache_prefix: str, system: Optional[str] = None) -> bool:
+        """Whether the backend would serve `cache_prefix` (as passed to acompletion) from a context cache."""
+        prefix = self._prefix(system or DEFAULT_SYSTEM_MESSAGE, cache_prefix)
+        return self.backend.caches_prefix(self._estimate_tokens(prefix))
+
+    @staticmethod
+    def _prefix(system_msg: str, cache_prefix: Optional[str]) -> Optional[str]:
+        # The system message is part of the full prompt, so it leads the shared prefix too
+        return f"{system_msg}\n\n{cache_prefix}" if cache_prefix else None
+
+    @staticmethod
+    def _usage(response: Any) -> Dict[str, Optional[int]]:
+        """Token counts from Gemini usage metadata (None when the SDK does not report them)."""
+        usage = getattr(response, "usage_metadata", None)
+        return {
+            "prompt_tokens": getattr(usage, "prompt_token_count", None),
+            "response_tokens": getattr(usage, "candidates_token_count", None),
+            "thinking_tokens": getattr(usage, "thoughts_token_count", None),
+            "cached_tokens": getattr(usage, "cached_content_token_count", None),
+        }
+
+    @staticmethod
+    def _record_call(call: Dict[str, Any], started: float, outcome: str) -> None:
+        call["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        agent = call["agent"]
+        metrics = get_metrics()
+        metrics.inc("aether_llm_calls_total", agent=agent, outcome=outcome)
+        if call["retries"]:
+            metrics.inc("aether_llm_retries_total", call["retries"], agent=agent)
+        if outcome != "cache_hit":
+            metrics.observe("aether_llm_call_seconds", call["latency_ms"] / 1000, agent=agent)
+        for kind in ("prompt", "response", "thinking", "cached"):
+            tokens = call.get(f"{kind}_tokens")
+            if tokens:
+                metrics.inc("aether_llm_tokens_total", tokens, agent=agent, kind=kind)
+        if call.get("prompt_tokens"):
+            metrics.observe("aether_llm_prompt_tokens", call["prompt_tokens"], agent=agent)
+        if call.get("response_tokens"):
+            metrics.observe("aether_llm_response_tokens", call["response_tokens"], agent=agent)
+
+        records = call_records.get()
+        if records is not None:
+            records.append(call)
+
+    def _is_cacheable(self, text: str) -> bool:
+        # Never pin a malformed answer: only responses the agents can parse are stored
+        try:
+            self.parse_json(text)
+            return True
+        except Exception:
+            return False
 
-        return response.text or ""
+    def _parsed_items(self, text: str, item_key: str) -> List[Dict[str, Any]]:
+        """The `item_key` array of a complete answer; MalformedStreamError unless it holds only objects."""
+        items = self.parse_json(text).get(item_key, [])
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise MalformedStreamError(f"{item_key} is not an array of objects")
+        return items
 
     def parse_json(self, text: str) -> Dict[str, Any]:
         text = text.strip()
@@ -46,8 +383,16 @@ class LLMClient:
         except Exception:
             pass
 
-        match = re.search(r"\{[\s\S]*\}", text)
-        if match:
-            return json.loads(match.group(0))
+        # First decodable object, so prose after the JSON (or a second object) is ignored
+        decoder = json.JSONDecoder()
+        start = text.find("{")
+        while start != -1:
+            try:
+                data, _ = decoder.raw_decode(text, start)
+                if isinstance(data, dict):
+                    return data
+            except ValueError:
+                pass
+            start = text.find("{", start + 1)
 
         raise ValueError("No valid JSON object found in LLM output")
@@ -1,23 +1,190 @@
 from __future__ import annotations
 
+import asyncio
+import gzip
+import hashlib
+import io
 import json
+import os
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, IO, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+# Sessions were logged to one JSON array before the JSON Lines format
+LEGACY_LOG_NAME = "reasoning_logs.json"
+# Sorts before every real rotation stamp, so migrated sessions read as the oldest segment
+_LEGACY_STAMP = "00000000T000000000000"
 
 
 class ReasoningLogger:
-    @staticmethod
-    def save_session(session: Dict[str, Any], file_path: Path) -> None:
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        if file_path.exists():
-            try:
-                data = json.loads(file_path.read_text(encoding="utf-8") or "[]")
-                if not isinstance(data, list):
-                    data = []
-            except Exception:
-                data = []
+    """Append-only JSON Lines session log with rotation.
+
+    `log` is non-blocking once `start` has launched the background writer: sessions
+    are queued and appended in batches off the event loop. The active segment is
+    rotated when it exceeds `max_bytes` or `max_age_seconds`; rotated segments are
+    optionally compressed (gzip, or zstd when `zstandard` is installed).
+    """
+
+    def __init__(
+        self,
+        file_path: Path,
+        max_bytes: int = 50 * 1024 * 1024,
+        max_age_seconds: float = 24 * 3600,
+        compression: str = "gzip",
+    ) -> None:
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        if compression == "zstd" and zstandard is None:
+            print("Warning: zstandard not installed, rotating reasoning logs with gzip")
+            compression = "gzip"
+        self.compression = compression
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._segment_started = (
+            self.file_path.stat().st_mtime if self.file_path.exists() else time.time()
+        )
+
+    # -- writing ---------------------------------------------------------
+
+    def log(self, session: Dict[str, Any]) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait(session)
         else:
-            data = []
+            # No writer running (scripts, tests): write inline
+            self._write_batch([session])
+
+    async def start(self) -> None:
+        if self._writer is None:
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush queued sessions and stop the writer."""
+        if self._writer is None:
+            return
+        await self._queue.put(None)
+        await self._writer
+        self._writer = None
+        self._queue = None
+
+    async def _run(self) -> None:
+        while True:
+            batch: List[Dict[str, Any]] = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            stopping = batch[-1] is None
+            sessions = [s for s in batch if s is not None]
+            if sessions:
+                try:
+                    await asyncio.to_thread(self._write_batch, sessions)
+                except Exception as e:
+                    print(f"Warning: Failed to write reasoning log: {e}")
+            if stopping:
+                return
+
+    def _write_batch(self, sessions: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(s, ensure_ascii=False) + "\n" for s in sessions)
+        with self.file_path.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+        if self._should_rotate():
+            self._rotate()
+
+    def _should_rotate(self) -> bool:
+        size = self.file_path.stat().st_size
+        age = time.time() - self._segment_started
+        return size >= self.max_bytes or age >= self.max_age_seconds
+
+    def _rotate(self) -> None:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        rotated = self.file_path.with_name(f"{self.file_path.stem}-{stamp}{self.file_path.suffix}")
+        self.file_path.rename(rotated)
+        self._segment_started = time.time()
+
+        if self.compression == "gzip":
+            target = rotated.with_name(rotated.name + ".gz")
+            with rotated.open("rb") as src, gzip.open(target, "wb") as dst:
+                dst.writelines(src)
+        elif self.compression == "zstd":
+            target = rotated.with_name(rotated.name + ".zst")
+            with rotated.open("rb") as src, target.open("wb") as dst:
+                zstandard.ZstdCompressor().copy_stream(src, dst)
+        else:
+            return
+        rotated.unlink()
+
+    def migrate_legacy(self, legacy_path: Path) -> List[Dict[str, Any]]:
+        """Convert a pre-JSONL array log into the oldest segment; returns the migrated sessions.
+
+        Legacy sessions get a session_id derived from their content, so importing them
+        twice is harmless. The array file is renamed to `<name>.migrated` afterwards.
+        """
+        if not legacy_path.exists():
+            return []
+        try:
+            data = json.loads(legacy_path.read_text(encoding="utf-8") or "[]")
+        except json.JSONDecodeError as e:
+            print(f"Warning: Could not migrate {legacy_path.name}: {e}")
+            return []
+        sessions = [s for s in data if isinstance(s, dict)] if isinstance(data, list) else []
+        for session in sessions:
+            if not session.get("session_id"):
+                payload = json.dumps(session, sort_keys=True, ensure_ascii=False).encode("utf-8")
+                session["session_id"] = hashlib.sha256(payload).hexdigest()[:32]
+
+        segment = self.file_path.with_name(f"{self.file_path.stem}-{_LEGACY_STAMP}{self.file_path.suffix}")
+        tmp = segment.with_name(segment.name + ".tmp")
+        tmp.write_text("".join(json.dumps(s, ensure_ascii=False) + "\n" for s in sessions), encoding="utf-8")
+        os.replace(tmp, segment)
+        legacy_path.rename(legacy_path.with_name(legacy_path.name + ".migrated"))
+        print(f"[LOGGER] Migrated {len(sessions)} sessions from {legacy_path.name}")
+        return sessions
+
+    # -- reading ---------------------------------------------------------
+
+    def segments(self) -> List[Path]:
+        """Rotated segments oldest first, then the active file."""
+        pattern = f"{self.file_path.stem}-*{self.file_path.suffix}*"
+        rotated = sorted(self.file_path.parent.glob(pattern))
+        return rotated + ([self.file_path] if self.file_path.exists() else [])
+
+    @staticmethod
+    def _open_segment(path: Path) -> IO[str]:
+        if path.suffix == ".gz":
+            return gzip.open(path, "rt", encoding="utf-8")
+        if path.suffix == ".zst":
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to read {path.name}")
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(path.open("rb")), encoding="utf-8")
+        return path.open("r", encoding="utf-8")
+
+    def iter_sessions(self) -> Iterator[Dict[str, Any]]:
+        """Lazily yield every logged session, oldest first, one line at a time."""
+        for path in self.segments():
+            with self._open_segment(path) as fh:
+                for line in fh:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash should not hide the rest
+                        continue
+
 
-        data.append(session)
-        file_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+def reasoning_logger_from_env(logs_dir: Path) -> ReasoningLogger:
+    return ReasoningLogger(
+        logs_dir / "reasoning_logs.jsonl",
+        max_bytes=int(os.getenv("REASONING_LOG_MAX_BYTES", str(50 * 1024 * 1024))),
+        max_age_seconds=float(os.getenv("REASONING_LOG_MAX_AGE_HOURS", "24")) * 3600,
+        compression=os.getenv("REASONING_LOG_COMPRESSION", "gzip").lower(),
+    )
@@ -0,0 +1,163 @@
+"""In-process counters and histograms exposed in Prometheus text format."""
+
+from __future__ import annotations
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Request-scoped sink: the orchestrator installs a list per analysis and LLMClient
+# appends one record per call, so the session log can carry the per-call breakdown.
+call_records: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar(
+    "llm_call_records", default=None
+)
+
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+TOKEN_BUCKETS = (64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536, 131072)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Minimal Prometheus-style registry (counters and histograms with labels)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._buckets: Dict[str, Sequence[float]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._help[name] = ("counter", help_text)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = SECONDS_BUCKETS) -> None:
+        self._help[name] = ("histogram", help_text)
+        self._buckets[name] = buckets
+        self._histograms.setdefault(name, {})
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + amount
+
+    def value(self, name: str, **labels: str) -> float:
+        """Current value of one counter series (0 if it was never incremented)."""
+        with self._lock:
+            return self._counters[name].get(self._key(labels), 0.0)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms[name]
+            if key not in series:
+                series[key] = Histogram(self._buckets[name])
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    @staticmethod
+    def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(key) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    @staticmethod
+    def _format_number(value: float) -> str:
+        return repr(float(value)) if value != int(value) else str(int(value))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help_text) in self._help.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "counter":
+                    for key, value in self._counters[name].items():
+                        lines.append(f"{name}{self._format_labels(key)} {self._format_number(value)}")
+                    continue
+                for key, hist in self._histograms[name].items():
+                    cumulative = 0
+                    for bound, count in zip(self._buckets[name], hist.counts):
+                        cumulative += count
+                        le = ("le", self._format_number(bound))
+                        lines.append(f"{name}_bucket{self._format_labels(key, le)} {cumulative}")
+                    inf = ("le", "+Inf")
+                    lines.append(f"{name}_bucket{self._format_labels(key, inf)} {hist.count}")
+                    lines.append(f"{name}_sum{self._format_labels(key)} {self._format_number(hist.sum)}")
+                    lines.append(f"{name}_count{self._format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+_shared_metrics: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    global _shared_metrics
+    if _shared_metrics is None:
+        registry = MetricsRegistry()
+        registry.histogram("aether_llm_call_seconds", "LLM call latency by agent (cache hits excluded)")
+        registry.histogram("aether_llm_prompt_tokens", "Prompt tokens per LLM call by agent", TOKEN_BUCKETS)
+        registry.histogram("aether_llm_response_tokens", "Response tokens per LLM call by agent", TOKEN_BUCKETS)
+        registry.counter("aether_llm_calls_total", "LLM calls by agent and outcome (ok, error, cache_hit)")
+        registry.counter("aether_llm_retries_total", "LLM retries by agent")
+        registry.counter("aether_llm_tokens_total", "Tokens reported by Gemini usage metadata by agent and kind")
+        registry.histogram("aether_stage_seconds", "Pipeline stage duration (extractor, debates, synthesizer, ...)")
+        registry.histogram("aether_pdf_parse_seconds", "PDF parse duration (text + tables)")
+        registry.histogram("aether_pdf_page_seconds", "Per-page PDF parse time by step (text, tables)")
+        registry.counter("aether_pdf_pages_total", "Parsed PDF pages by table step (parsed, skipped without ruling lines)")
+        registry.histogram("aether_pdf_render_seconds", "PDF report render duration (cache misses only)")
+        registry.counter("aether_analyses_total", "Completed analyses by outcome")
+        registry.counter("aether_debates_reused_total", "Debates carried over by incremental re-analysis")
+        _shared_metrics = registry
+    return _shared_metrics
+
+
+def summarize_calls(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-agent totals (calls, cache hits, retries, tokens, latency) for one analysis."""
+    summary: Dict[str, Dict[str, Any]] = {}
+    for call in records:
+        agent = summary.setdefault(call["agent"], {
+            "calls": 0, "cache_hits": 0, "retries": 0, "errors": 0,
+            "prompt_tokens": 0, "response_tokens": 0, "cached_tokens": 0, "latency_ms": 0.0,
+        })
+        agent["calls"] += 1
+        agent["cache_hits"] += int(call.get("cache_hit", False))
+        agent["retries"] += call.get("retries", 0)
+        agent["errors"] += int("error" in call)
+        agent["prompt_tokens"] += call.get("prompt_tokens") or 0
+        agent["response_tokens"] += call.get("response_tokens") or 0
+        agent["cached_tokens"] += call.get("cached_tokens") or 0
+        agent["latency_ms"] = round(agent["latency_ms"] + call.get("latency_ms", 0.0), 1)
+    return summary
@@ -1,13 +1,252 @@
-"""PDF parsing utility to extract text and tables from PDF files."""
+"""PDF parsing utility to extract text and tables from PDF files.
+
+Camelot and pandas are imported on first table extraction (or by
+`load_table_stack` in PDF workers), so importing this module stays cheap.
+"""
+
+from __future__ import annotations
 
 from io import BytesIO
-from typing import Optional, List
+from typing import TYPE_CHECKING, Any, Dict, Optional, List, Sequence
+import os
+import re
+import tempfile
+import threading
+import time
 import warnings
 
 from PyPDF2 import PdfReader
-import camelot
 
-from app.schemas.context import Metric
+from app.schemas.context import Metric, ReasoningContext
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Content-stream operators that draw ruling lines: rectangles and line segments
+_RULING_OPERATOR = re.compile(rb"(?<![A-Za-z])(re|l)(?![A-Za-z])")
+
+
+def _page_has_ruling_lines(page) -> bool:
+    """
+    Cheap pre-check for Camelot's lattice flavor, which only finds ruled tables.
+
+    Pages with no rectangles and fewer than a handful of line segments (e.g. a
+    single header rule) cannot yield a lattice table, so Camelot is skipped.
+    """
+    try:
+        contents = page.get_contents()
+        data = contents.get_data() if contents is not None else b""
+    except Exception:
+        # If the stream can't be inspected, let Camelot decide
+        return True
+
+    ops = _RULING_OPERATOR.findall(data)
+    return ops.count(b"re") >= 2 or ops.count(b"l") >= 4
+
+
+_table_stack_lock = threading.Lock()
+
+
+def load_table_stack():
+    """Import and return Camelot (pandas comes with it); its import chain takes a few hundred ms.
+
+    Serialized because first imports of its native dependencies from several
+    parser threads at once can crash the process.
+    """
+    with _table_stack_lock:
+        import camelot
+
+    return camelot
+
+
+# Currency symbols, thousands separators, percent signs, parentheses and whitespace
+_NON_NUMERIC_CHARS = r"[\s,$€£¥₹%()]"
+_PARENTHESISED = r"^\(.*\)$"
+
+
+def _coerce_numeric(cells: pd.Series) -> pd.Series:
+    """
+    Bulk-convert table cells to floats; non-numeric cells become NaN.
+
+    Handles thousands separators ("1,234"), percentages ("12.5%" -> 12.5),
+    currency symbols ("$40") and accounting negatives ("(3.2)" -> -3.2).
+    """
+    import pandas as pd
+
+    text = cells.astype(str).str.strip().str.replace("\u2212", "-", regex=False)
+    negative = text.str.match(_PARENTHESISED)
+    values = pd.to_numeric(text.str.replace(_NON_NUMERIC_CHARS, "", regex=True), errors="coerce")
+    return values.where(~negative, -values)
+
+
+def _table_to_frame(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """Melt one Camelot table into (name, region, value) rows, row-major like the table."""
+    import pandas as pd
+
+    if df.empty or len(df) < 2:  # Need at least header + 1 row
+        return None
+
+    # First row is header, first column is the region label
+    headers = df.iloc[0].astype(str).str.strip().to_numpy()
+    body = df.iloc[1:].reset_index(drop=True)
+    body.columns = range(body.shape[1])
+
+    long = body.assign(_row=body.index, _region=body[0].astype(str)).melt(
+        id_vars=["_row", "_region"], var_name="_col", value_name="_cell"
+    )
+    long["value"] = _coerce_numeric(long["_cell"])
+    long = long[long["value"].notna()].sort_values(["_row", "_col"], kind="stable")
+    if long.empty:
+        return None
+
+    return pd.DataFrame({
+        "name": headers[long["_col"].to_numpy(dtype=int)],
+        "region": long["_region"].to_numpy(),
+        "value": long["value"].to_numpy(dtype=float),
+    })
+
+
+def _tables_to_metrics(tables) -> List[Metric]:
+    """Convert Camelot tables to metrics (first row = header, first column = region)."""
+    frames = [f for f in (_table_to_frame(table.df) for table in tables) if f is not None]
+    if not frames:
+        return []
+
+    import pandas as pd
+
+    rows = pd.concat(frames, ignore_index=True)
+    # Values are already coerced to float above, so skip per-cell validation
+    return [
+        Metric.model_construct(name=name, region=region, value=value)
+        for name, region, value in zip(
+            rows["name"].tolist(), rows["region"].tolist(), rows["value"].tolist()
+        )
+    ]
+
+
+def read_pdf_header(path: str) -> Dict[str, Any]:
+    """
+    Open a PDF once and return its page count and document metadata.
+
+    Args:
+        path: Path to a PDF file on disk
+
+    Returns:
+        Dictionary with 'num_pages' and 'metadata'
+
+    Raises:
+        ValueError: If PDF is invalid or has no pages
+    """
+    try:
+        reader = PdfReader(path)
+        if not reader.pages:
+            raise ValueError("PDF has no pages")
+        metadata = reader.metadata if reader.metadata else {}
+        return {
+            "num_pages": len(reader.pages),
+            "metadata": {
+                "title": metadata.get("/Title", ""),
+                "author": metadata.get("/Author", ""),
+                "subject": metadata.get("/Subject", ""),
+                "creator": metadata.get("/Creator", ""),
+            },
+        }
+    except Exception as e:
+        raise ValueError(f"Failed to parse PDF: {str(e)}")
+
+
+def extract_pages(path: str, page_numbers: Sequence[int]) -> List[Dict[str, Any]]:
+    """
+    Extract text and table metrics for a range of pages from one open reader.
+
+    This is the unit of work handed to each PDF worker process.
+
+    Args:
+        path: Path to a PDF file on disk
+        page_numbers: 1-based page numbers to process
+
+    Returns:
+        One dict per page with 'page', 'text', 'metrics' and 'timings' (ms)
+    """
+    reader = PdfReader(path)
+    results = []
+
+    for page_num in page_numbers:
+        page = reader.pages[page_num - 1]
+        started = time.perf_counter()
+
+        text = ""
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            # Log but continue if one page fails
+            print(f"Warning: Failed to extract text from page {page_num}: {e}")
+        text_done = time.perf_counter()
+
+        metrics: List[Metric] = []
+        tables_skipped = not _page_has_ruling_lines(page)
+        if not tables_skipped:
+            try:
+                camelot = load_table_stack()
+                # Suppress Camelot warnings
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    tables = camelot.read_pdf(path, pages=str(page_num))
+                metrics = _tables_to_metrics(tables)
+            except Exception as e:
+                # Log but don't crash - table parsing is optional
+                print(f"Warning: Failed to extract tables from page {page_num}: {e}")
+        tables_done = time.perf_counter()
+
+        results.append({
+            "page": page_num,
+            "text": text,
+            "metrics": metrics,
+            "timings": {
+                "text_ms": round((text_done - started) * 1000, 1),
+                "tables_ms": round((tables_done - text_done) * 1000, 1),
+                "tables_skipped": tables_skipped,
+            },
+        })
+
+    return results
+
+
+def assemble_document(header: Dict[str, Any], pages: List[Dict[str, Any]]) -> dict:
+    """
+    Merge per-page results (in any order) into the extract_metadata_and_text shape.
+
+    Raises:
+        ValueError: If no page produced any text
+    """
+    pages = sorted(pages, key=lambda p: p["page"])
+    text_content = [p["text"] for p in pages if p["text"]]
+    if not text_content:
+        raise ValueError("No text could be extracted from PDF")
+
+    return {
+        "text": "\n".join(text_content),
+        "num_pages": header["num_pages"],
+        "metadata": header["metadata"],
+        "metrics": [m for p in pages for m in p["metrics"]],
+        "page_timings": [{"page": p["page"], **p["timings"]} for p in pages],
+    }
+
+
+def write_temp_pdf(file_bytes: bytes) -> str:
+    """Write bytes to a temporary .pdf (Camelot requires a file path); caller deletes it."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(file_bytes)
+        return tmp.name
+
+
+def remove_temp_pdf(path: Optional[str]) -> None:
+    try:
+        if path:
+            os.unlink(path)
+    except Exception:
+        pass
 
 
 def extract_text_from_pdf(file_bytes: bytes) -> str:
@@ -60,103 +299,53 @@ def extract_tables_from_pdf(file_bytes: bytes) -> List[Metric]:
     Returns:
         List of Metric objects from numeric values in tables
     """
-    metrics = []
-    
-    # Save bytes to temporary file (Camelot requires file path)
-    import tempfile
-    import os
-    
+    tmp_path = None
     try:
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            tmp.write(file_bytes)
-            tmp_path = tmp.name
-        
-        # Suppress Camelot warnings
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            tables = camelot.read_pdf(tmp_path, pages="all")
-        
-        if not tables:
-            return metrics
-        
-        # Process each table
-        for table in tables:
-            df = table.df
-            if df.empty or len(df) < 2:  # Need at least header + 1 row
-                continue
-            
-            # First row is header
-            headers = df.iloc[0].tolist()
-            
-            # Process remaining rows
-            for row_idx in range(1, len(df)):
-                row = df.iloc[row_idx]
-                region = str(row.iloc[0]) if len(row) > 0 else None
-                
-                # Check each column for numeric values
-                for col_idx, header in enumerate(headers):
-                    if col_idx >= len(row):
-                        continue
-                    
-                    cell_value = row.iloc[col_idx]
-                    
-                    # Try to convert to numeric
-                    try:
-                        numeric_value = float(str(cell_value).strip())
-                        metric = Metric(
-                            name=str(header).strip(),
-                            region=region,
-                            value=numeric_value
-                        )
-                        metrics.append(metric)
-                    except (ValueError, TypeError):
-                        # Not numeric, skip
-                        continue
-    
+        tmp_path = write_temp_pdf(file_bytes)
+        header = read_pdf_header(tmp_path)
+        pages = extract_pages(tmp_path, range(1, header["num_pages"] + 1))
+        return [m for p in pages for m in p["metrics"]]
     except Exception as e:
         # Log but don't crash - table parsing is optional
         print(f"Warning: Failed to extract tables from PDF: {e}")
-        return metrics
-    
+        return []
     finally:
-        # Clean up temporary file
-        try:
-            if 'tmp_path' in locals():
-                os.unlink(tmp_path)
-        except Exception:
-            pass
-    
-    return metrics
+        remove_temp_pdf(tmp_path)
 
 
 def extract_metadata_and_text(file_bytes: bytes) -> dict:
     """
-    Extract both metadata, text, and tables from PDF.
+    Extract both metadata, text, and tables from PDF in a single pass.
 
     Args:
         file_bytes: Raw PDF file bytes
 
     Returns:
-        Dictionary with 'text', 'num_pages', 'metadata', and 'metrics'
+        Dictionary with 'text', 'num_pages', 'metadata', 'metrics' and 'page_timings'
     """
+    tmp_path = None
     try:
-        pdf_file = BytesIO(file_bytes)
-        reader = PdfReader(pdf_file)
-
-        metadata = reader.metadata if reader.metadata else {}
-        text = extract_text_from_pdf(file_bytes)
-        metrics = extract_tables_from_pdf(file_bytes)
-
-        return {
-            "text": text,
-            "num_pages": len(reader.pages),
-            "metadata": {
-                "title": metadata.get("/Title", ""),
-                "author": metadata.get("/Author", ""),
-                "subject": metadata.get("/Subject", ""),
-                "creator": metadata.get("/Creator", ""),
-            },
-            "metrics": metrics,
-        }
+        tmp_path = write_temp_pdf(file_bytes)
+        header = read_pdf_header(tmp_path)
+        pages = extract_pages(tmp_path, range(1, header["num_pages"] + 1))
+        return assemble_document(header, pages)
     except Exception as e:
         raise ValueError(f"Failed to extract metadata: {str(e)}")
+    finally:
+        remove_temp_pdf(tmp_path)
+
+
+def document_info(pdf_data: dict) -> dict:
+    """Source-document facts stored with a PDF's analysis result (kept on result-cache hits)."""
+    return {"num_pages": pdf_data["num_pages"]}
+
+
+def context_from_pdf(pdf_data: dict) -> ReasoningContext:
+    """Reasoning context for a parsed PDF: its text as the narrative plus table metrics."""
+    return ReasoningContext(
+        narrative=pdf_data["text"],
+        extracted_facts=[],
+        metrics=pdf_data.get("metrics", []),
+        assumptions=[],
+        limitations=[]
+    )
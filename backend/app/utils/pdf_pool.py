@@ -0,0 +1,177 @@
+"""Process pool that keeps CPU-heavy PDF parsing off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.utils.metrics import get_metrics
+from app.utils.pdf_parser import (
+    assemble_document,
+    extract_pages,
+    read_pdf_header,
+    remove_temp_pdf,
+    write_temp_pdf,
+)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Jobs submitted through `run` and not finished yet, per pool
+_in_flight: Dict[ProcessPoolExecutor, int] = {}
+# Pools replaced after a timeout; each is terminated when its last in-flight job finishes
+_retiring: Set[ProcessPoolExecutor] = set()
+
+
+def _init_worker() -> None:
+    # Pay PyPDF2/Camelot import cost once per worker, not once per job
+    from app.utils.pdf_parser import load_table_stack
+
+    load_table_stack()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _pool_size() -> int:
+    return max(1, int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1)))))
+
+
+def _parse_timeout() -> float:
+    return float(os.getenv("PDF_PARSE_TIMEOUT_SECONDS", "120"))
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=_pool_size(), initializer=_init_worker)
+    return _pool
+
+
+async def warm_up() -> None:
+    """Spawn every worker up front so the first upload does not pay process start-up."""
+    loop = asyncio.get_running_loop()
+    pool = get_pdf_pool()
+    await asyncio.gather(*(loop.run_in_executor(pool, _ping) for _ in range(_pool_size())))
+
+
+def _terminate(pool: ProcessPoolExecutor) -> None:
+    # ProcessPoolExecutor cannot cancel a running job, so terminate its workers directly
+    for process in list(getattr(pool, "_processes", {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False)
+
+
+def _recycle_pool() -> None:
+    """Retire a pool whose worker is stuck on a timed-out document (or has crashed).
+
+    New jobs go to a fresh pool straight away. The old pool keeps running the jobs
+    other requests already submitted to it, and its workers are terminated once the
+    last of them finishes, so one slow document never fails unrelated work.
+    """
+    global _pool
+    if _pool is None:
+        return
+    pool, _pool = _pool, None
+    if _in_flight.get(pool):
+        _retiring.add(pool)
+    else:
+        _terminate(pool)
+
+
+def _release(pool: ProcessPoolExecutor) -> None:
+    _in_flight[pool] -= 1
+    if _in_flight[pool] == 0:
+        del _in_flight[pool]
+        if pool in _retiring:
+            _retiring.discard(pool)
+            _terminate(pool)
+
+
+async def _run_on(pool: ProcessPoolExecutor, fn: Callable[..., Any], *args: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    _in_flight[pool] = _in_flight.get(pool, 0) + 1
+    try:
+        return await loop.run_in_executor(pool, fn, *args)
+    except BrokenProcessPool:
+        if _pool is pool:
+            _recycle_pool()
+        raise
+    finally:
+        _release(pool)
+
+
+async def run(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run `fn(*args)` in the pool; parsing, report rendering and batches all go through here.
+
+    A job whose pool broke under it (a worker died, e.g. crashing on a malformed
+    document) is retried once on a fresh pool.
+    """
+    try:
+        return await _run_on(get_pdf_pool(), fn, *args)
+    except BrokenProcessPool:
+        print(f"[PDF POOL] Worker pool broke; retrying {getattr(fn, '__name__', 'job')} on a fresh pool")
+        return await _run_on(get_pdf_pool(), fn, *args)
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    for pool in list(_retiring):
+        _terminate(pool)
+    _retiring.clear()
+    _in_flight.clear()
+
+
+def _page_chunks(num_pages: int, workers: int) -> List[List[int]]:
+    # Two chunks per worker evens out pages with expensive tables
+    size = max(1, math.ceil(num_pages / (workers * 2)))
+    pages = list(range(1, num_pages + 1))
+    return [pages[i:i + size] for i in range(0, num_pages, size)]
+
+
+async def _parse_parallel(file_bytes: bytes) -> dict:
+    tmp_path = await asyncio.to_thread(write_temp_pdf, file_bytes)
+    try:
+        header = await run(read_pdf_header, tmp_path)
+        chunks = _page_chunks(header["num_pages"], _pool_size())
+        results = await asyncio.gather(*(run(extract_pages, tmp_path, chunk) for chunk in chunks))
+        return assemble_document(header, [page for chunk in results for page in chunk])
+    finally:
+        remove_temp_pdf(tmp_path)
+
+
+async def parse_pdf(file_bytes: bytes) -> dict:
+    """Extract text, tables and per-page timings with pages spread across the pool.
+
+    The whole document is bounded by PDF_PARSE_TIMEOUT_SECONDS.
+
+    Raises:
+        TimeoutError: If the document takes longer than the configured timeout
+        ValueError: If the PDF is invalid or corrupted
+    """
+    timeout = _parse_timeout()
+    try:
+        pdf_data = await asyncio.wait_for(_parse_parallel(file_bytes), timeout=timeout)
+    except asyncio.TimeoutError:
+        _recycle_pool()
+        raise TimeoutError(f"PDF parsing exceeded {timeout:.0f}s")
+    _observe_pages(pdf_data["page_timings"])
+    return pdf_data
+
+
+def _observe_pages(page_timings: List[Dict[str, Any]]) -> None:
+    metrics = get_metrics()
+    for timing in page_timings:
+        metrics.observe("aether_pdf_page_seconds", timing["text_ms"] / 1000, step="text")
+        if timing["tables_skipped"]:
+            metrics.inc("aether_pdf_pages_total", tables="skipped")
+        else:
+            metrics.observe("aether_pdf_page_seconds", timing["tables_ms"] / 1000, step="tables")
+            metrics.inc("aether_pdf_pages_total", tables="parsed")
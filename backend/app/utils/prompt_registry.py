@@ -0,0 +1,57 @@
+"""Prompt templates loaded once per process, with optional hot-reload on file change."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+PROMPTS_DIR = Path(__file__).resolve().parents[1] / "prompts"
+
+
+class PromptRegistry:
+    """Template text (and the rendered `"<template>\\n\\n"` prompt prefix) per prompt file.
+
+    Files are read on first use and kept in memory. With `hot_reload`, each lookup
+    stats the file and re-reads it when its mtime changed, so prompts can be edited
+    without restarting the server.
+    """
+
+    def __init__(self, prompts_dir: Path = PROMPTS_DIR, hot_reload: bool = False) -> None:
+        self.prompts_dir = prompts_dir
+        self.hot_reload = hot_reload
+        # filename -> (mtime_ns, template, prefix)
+        self._entries: Dict[str, Tuple[int, str, str]] = {}
+
+    def _entry(self, filename: str) -> Tuple[int, str, str]:
+        entry = self._entries.get(filename)
+        if entry is not None and not self.hot_reload:
+            return entry
+        path = self.prompts_dir / filename
+        mtime = path.stat().st_mtime_ns
+        if entry is None or entry[0] != mtime:
+            if entry is not None:
+                print(f"[PROMPTS] Reloaded {filename}")
+            template = path.read_text(encoding="utf-8")
+            entry = (mtime, template, f"{template}\n\n")
+            self._entries[filename] = entry
+        return entry
+
+    def template(self, filename: str) -> str:
+        return self._entry(filename)[1]
+
+    def prefix(self, filename: str) -> str:
+        """The template followed by the blank line that separates it from the prompt's inputs."""
+        return self._entry(filename)[2]
+
+
+_shared_registry: Optional[PromptRegistry] = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    global _shared_registry
+    if _shared_registry is None:
+        hot_reload = os.getenv("AETHER_PROMPT_HOT_RELOAD", "false").lower() in ("1", "true", "yes")
+        _shared_registry = PromptRegistry(hot_reload=hot_reload)
+    return _shared_registry
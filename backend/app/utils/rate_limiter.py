@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Reservation-based token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens (possibly going into debt) and return seconds to wait."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class RateLimiter:
+    """Process-wide requests/min + tokens/min limiter with a shared cooldown.
+
+    Callers reserve capacity up front, so waiters are served in arrival order
+    without holding a lock. When the server pushes back (429 / retry hint),
+    `penalize` pauses every caller until the hinted time has passed.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.cooldown_until = 0.0
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        wait = max(
+            self.requests.reserve(1),
+            self.tokens.reserve(estimated_tokens),
+            self.cooldown_until - time.monotonic(),
+        )
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return max(wait, 0.0)
+
+    def penalize(self, delay: float) -> None:
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + delay)
+
+
+_shared_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the limiter shared by every LLMClient in this process."""
+    global _shared_limiter
+    if _shared_limiter is None:
+        _shared_limiter = RateLimiter(
+            requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+            tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000")),
+        )
+    return _shared_limiter
@@ -0,0 +1,59 @@
+"""Off-loop, cached rendering of AETHER PDF reports."""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, Iterator, Optional
+
+from app.utils import pdf_pool
+from app.utils.metrics import get_metrics
+from app.utils.result_cache import ResultCache, hash_text
+
+
+_generator = None
+_report_cache: Optional[ResultCache] = None
+
+
+def render_report(analysis_result: Dict[str, Any], input_text: str) -> bytes:
+    """Build the report in a pool worker, reusing one generator (and its styles) per process."""
+    global _generator
+    if _generator is None:
+        from app.utils.pdf_generator import AETHERPDFGenerator
+        _generator = AETHERPDFGenerator()
+    return _generator.generate_report(analysis_result, input_text)
+
+
+def get_report_cache() -> ResultCache:
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ResultCache(
+            max_entries=int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "32")),
+            ttl_seconds=float(os.getenv("REPORT_CACHE_TTL_SECONDS", "3600")),
+        )
+    return _report_cache
+
+
+def report_key(analysis_result: Dict[str, Any], input_text: str) -> str:
+    payload = json.dumps(
+        {"result": analysis_result, "input_text": input_text}, sort_keys=True, ensure_ascii=False
+    )
+    return "report:" + hash_text(payload)
+
+
+async def render(analysis_result: Dict[str, Any], input_text: str) -> bytes:
+    """Return report bytes, rendering in the PDF process pool on a cache miss.
+
+    Repeated downloads of the same result are served from an LRU cache, and
+    concurrent requests for the same report share one render.
+    """
+    async def compute() -> bytes:
+        with get_metrics().timer("aether_pdf_render_seconds"):
+            return await pdf_pool.run(render_report, analysis_result, input_text)
+
+    return await get_report_cache().get_or_compute(report_key(analysis_result, input_text), compute)
+
+
+def iter_chunks(data: bytes, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
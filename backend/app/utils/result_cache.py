@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.utils.llm_cache import MemoryTier
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hash_bytes(text.encode("utf-8"))
+
+
+class ResultCache:
+    """Whole-pipeline result cache with single-flight coalescing.
+
+    Concurrent callers for the same key share one in-flight computation; the
+    computation is shielded so a disconnecting caller does not cancel it for
+    the others (it is only cancelled once every waiter is gone), and its
+    result is stored once it completes successfully - unless it was started
+    with `use_cache=False`, which neither reads nor fills the cache.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 3600.0) -> None:
+        self.memory = MemoryTier(max_entries, ttl_seconds)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _on_done(self, key: str, task: asyncio.Task, store: bool) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if store and not task.cancelled() and task.exception() is None:
+            self.memory.set(key, task.result())
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        use_cache: bool = True,
+    ) -> Any:
+        if use_cache:
+            cached = self.memory.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self.coalesced += 1
+                return await self._wait(inflight)
+
+        self.misses += 1
+        task = asyncio.create_task(compute())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t, use_cache))
+        return await self._wait(task)
+
+    async def _wait(self, task: asyncio.Task) -> Any:
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                # Last interested caller gave up (cancelled job / disconnect)
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "entries": len(self.memory),
+        }
+
+
+_shared_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    global _shared_result_cache
+    if _shared_result_cache is None:
+        _shared_result_cache = ResultCache(
+            max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "128")),
+            ttl_seconds=float(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600")),
+        )
+    return _shared_result_cache
@@ -0,0 +1,192 @@
+"""Per-factor BM25 retrieval over narrative chunks and table metrics.
+
+NumPy is imported where the index is built and scored, not at module import.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from app.schemas.context import ReasoningContext
+from app.schemas.factor import Factor
+from app.utils.context_compactor import PreparedContext, fit_base, pack_chunks, stitch_chunks, tokenize
+from app.utils.llm_client import estimate_tokens
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Snowball stemmers keep per-word state, so each thread (indexes are built off the loop) gets its own
+_stemmers = threading.local()
+
+
+@lru_cache(maxsize=65536)
+def _stem(term: str) -> str:
+    # The pure-Python stemmer is slow, and a document's vocabulary repeats heavily
+    stemmer = getattr(_stemmers, "english", None)
+    if stemmer is None:
+        import snowballstemmer
+
+        stemmer = _stemmers.english = snowballstemmer.stemmer("english")
+    return stemmer.stemWord(term)
+
+
+def index_terms(text: str) -> List[str]:
+    """Stopword-free tokens, Snowball (Porter2) stemmed: "pricing"/"prices" meet "price"."""
+    return [_stem(t) for t in tokenize(text)]
+
+
+class BM25Index:
+    """Okapi BM25 over pre-tokenized documents, stored as per-term postings arrays."""
+
+    def __init__(self, documents: Sequence[List[str]], k1: float = 1.5, b: float = 0.75) -> None:
+        import numpy as np
+
+        self.size = len(documents)
+        counts = [Counter(terms) for terms in documents]
+        lengths = np.array([len(terms) for terms in documents], dtype=np.float32)
+        avg_length = float(lengths.mean()) if self.size and lengths.mean() > 0 else 1.0
+        norms = k1 * (1 - b + b * lengths / avg_length)
+
+        postings: Dict[str, List[tuple]] = {}
+        for doc_id, tf in enumerate(counts):
+            for term, count in tf.items():
+                postings.setdefault(term, []).append((doc_id, count))
+
+        # Term weights are query-independent, so fold tf saturation and idf in up front
+        self._postings: Dict[str, tuple] = {}
+        for term, entries in postings.items():
+            doc_ids = np.fromiter((d for d, _ in entries), dtype=np.int32, count=len(entries))
+            tf = np.fromiter((c for _, c in entries), dtype=np.float32, count=len(entries))
+            idf = np.log1p((self.size - len(entries) + 0.5) / (len(entries) + 0.5))
+            self._postings[term] = (doc_ids, idf * tf * (k1 + 1) / (tf + norms[doc_ids]))
+
+    def scores(self, query_terms: Sequence[str]) -> np.ndarray:
+        import numpy as np
+
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(query_terms):
+            posting = self._postings.get(term)
+            if posting is not None:
+                np.add.at(scores, posting[0], posting[1])
+        return scores
+
+
+class RetrievalIndex:
+    """Chunk and metric indexes for one analysis; `view` builds a factor-specific context.
+
+    `support_view` is the compactor's shared support view, used as-is when there is
+    nothing for retrieval to cut.
+    """
+
+    def __init__(
+        self,
+        prepared: PreparedContext,
+        top_k_chunks: int,
+        top_k_metrics: int,
+        token_budget: int,
+        support_view: ReasoningContext,
+    ) -> None:
+        self.prepared = prepared
+        self.top_k_chunks = top_k_chunks
+        self.top_k_metrics = top_k_metrics
+        self.token_budget = token_budget
+        self.support_view = support_view
+        context = prepared.context
+        self.chunk_index = BM25Index([index_terms(c) for c in prepared.chunks])
+        self.metric_index = BM25Index([index_terms(f"{m.name} {m.region or ''}") for m in context.metrics])
+        self.selections: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def worthwhile(self) -> bool:
+        # Nothing to cut when the whole context is already within the top-k limits
+        return (
+            len(self.prepared.chunks) > self.top_k_chunks
+            or len(self.prepared.context.metrics) > self.top_k_metrics
+        )
+
+    @staticmethod
+    def _query(factors: Sequence[Factor]) -> List[str]:
+        return [t for f in factors for t in index_terms(f"{f.description} {f.domain.value}")]
+
+    def _top(self, scores: np.ndarray, k: int, tiebreak: Optional[Sequence[float]] = None) -> List[int]:
+        import numpy as np
+
+        if tiebreak is None:
+            order = np.argsort(-scores, kind="stable")
+        else:
+            # lexsort sorts by the last key first
+            order = np.lexsort((-np.asarray(tiebreak, dtype=np.float64), -scores))
+        return [int(i) for i in order[:k] if scores[i] > 0]
+
+    def view(self, factors: Sequence[Factor]) -> ReasoningContext:
+        """Top-k chunks and metrics for the factors' descriptions, within the support token budget.
+
+        Several factors (batched debates) retrieve top-k per factor and share the union.
+        Facts, assumptions and limitations are trimmed like the compactor's views when
+        they would crowd out the narrative; the best-ranked chunk is always kept.
+        """
+        context = self.prepared.context
+        if not self.worthwhile:
+            return self.support_view
+
+        chunk_ids: List[int] = []
+        metric_ids: List[int] = []
+        for factor in factors:
+            query = self._query([factor])
+            for i in self._top(self.chunk_index.scores(query), self.top_k_chunks, self.prepared.scores):
+                if i not in chunk_ids:
+                    chunk_ids.append(i)
+            for i in self._top(self.metric_index.scores(query), self.top_k_metrics):
+                if i not in metric_ids:
+                    metric_ids.append(i)
+        if not chunk_ids:
+            import numpy as np
+
+            # No lexical overlap at all: fall back to the document's most salient chunks
+            chunk_ids = self._top(np.ones(len(self.prepared.chunks), dtype=np.float32),
+                                  self.top_k_chunks, self.prepared.scores)
+
+        # Metrics in relevance order, so trimming drops the least relevant; then back in document order
+        base = fit_base(
+            context.model_copy(update={"narrative": "", "metrics": [context.metrics[i] for i in metric_ids]}),
+            self.token_budget,
+        )
+        metric_ids = sorted(metric_ids[: len(base.metrics)])
+        base = base.model_copy(update={"metrics": [context.metrics[i] for i in metric_ids]})
+        remaining = self.token_budget - estimate_tokens(base.model_dump_json())
+        chunks, selected = pack_chunks(self.prepared.chunks, chunk_ids, remaining)
+
+        view = base.model_copy(update={"narrative": stitch_chunks(chunks, selected)})
+        for factor in factors:
+            self.selections[factor.factor_id] = {
+                "chunks": sorted(selected),
+                "metrics": len(metric_ids),
+                "tokens": estimate_tokens(view.model_dump_json()),
+            }
+        return view
+
+
+class ContextRetriever:
+    """Settings holder; `index` is called once per analysis on the compaction stage's chunks."""
+
+    def __init__(self, top_k_chunks: int = 4, top_k_metrics: int = 12) -> None:
+        self.top_k_chunks = top_k_chunks
+        self.top_k_metrics = top_k_metrics
+
+    def index(self, prepared: PreparedContext, token_budget: int, support_view: ReasoningContext) -> RetrievalIndex:
+        return RetrievalIndex(prepared, self.top_k_chunks, self.top_k_metrics, token_budget, support_view)
+
+
+def context_retriever_from_env() -> Optional[ContextRetriever]:
+    """None when CONTEXT_RETRIEVAL is disabled; support agents then share one context view."""
+    if os.getenv("CONTEXT_RETRIEVAL", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return ContextRetriever(
+        top_k_chunks=int(os.getenv("CONTEXT_RETRIEVAL_TOP_K_CHUNKS", "4")),
+        top_k_metrics=int(os.getenv("CONTEXT_RETRIEVAL_TOP_K_METRICS", "12")),
+    )
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.utils.result_cache import hash_text
+
+
+class SessionStore:
+    """SQLite index over orchestrator session logs.
+
+    Summary columns (timestamp, context hash, confidence, factor domains) are
+    indexed for filtering; the full session JSON is only loaded by `get`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    context_hash TEXT NOT NULL,
+                    confidence REAL,
+                    factor_count INTEGER NOT NULL,
+                    narrative_preview TEXT,
+                    payload TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_sessions_timestamp ON sessions(timestamp);
+                CREATE INDEX IF NOT EXISTS idx_sessions_context_hash ON sessions(context_hash);
+                CREATE INDEX IF NOT EXISTS idx_sessions_confidence ON sessions(confidence);
+                CREATE TABLE IF NOT EXISTS session_domains (
+                    session_id TEXT NOT NULL,
+                    domain TEXT NOT NULL,
+                    PRIMARY KEY (session_id, domain)
+                );
+                CREATE INDEX IF NOT EXISTS idx_session_domains_domain ON session_domains(domain);
+                """
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def context_hash(input_context: Dict[str, Any]) -> str:
+        # Fallback for sessions logged before context_hash was recorded
+        return hash_text(json.dumps(input_context, sort_keys=True, ensure_ascii=False))
+
+    def add(self, session: Dict[str, Any]) -> str:
+        session_id = session.get("session_id") or uuid.uuid4().hex
+        input_context = session.get("input_context", {})
+        domains = sorted({
+            str(getattr(f["domain"], "value", f["domain"]))
+            for f in session.get("factors", [])
+            if f.get("domain")
+        })
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    session.get("timestamp", ""),
+                    session.get("context_hash") or self.context_hash(input_context),
+                    session.get("final_report", {}).get("confidence_score"),
+                    len(session.get("factors", [])),
+                    (input_context.get("narrative") or "")[:200],
+                    json.dumps(session, ensure_ascii=False),
+                ),
+            )
+            self._conn.execute("DELETE FROM session_domains WHERE session_id = ?", (session_id,))
+            self._conn.executemany(
+                "INSERT INTO session_domains VALUES (?, ?)", [(session_id, d) for d in domains]
+            )
+            self._conn.commit()
+        return session_id
+
+    def import_sessions(self, sessions: Iterable[Dict[str, Any]]) -> int:
+        """Backfill from an existing reasoning log; returns the number of sessions added."""
+        count = 0
+        for session in sessions:
+            self.add(session)
+            count += 1
+        return count
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def query(
+        self,
+        limit: int = 20,
+        offset: int = 0,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        domain: Optional[str] = None,
+        context_hash: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        max_confidence: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Newest-first page of session summaries matching every given filter."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp <= ?")
+            params.append(until)
+        if context_hash:
+            clauses.append("context_hash = ?")
+            params.append(context_hash)
+        if min_confidence is not None:
+            clauses.append("confidence >= ?")
+            params.append(min_confidence)
+        if max_confidence is not None:
+            clauses.append("confidence <= ?")
+            params.append(max_confidence)
+        if domain:
+            clauses.append("session_id IN (SELECT session_id FROM session_domains WHERE domain = ?)")
+            params.append(domain.lower())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM sessions {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT session_id, timestamp, context_hash, confidence, factor_count, narrative_preview"
+                f" FROM sessions {where} ORDER BY timestamp DESC LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+            domains: Dict[str, List[str]] = {}
+            ids = [r[0] for r in rows]
+            if ids:
+                placeholders = ",".join("?" * len(ids))
+                for session_id, d in self._conn.execute(
+                    f"SELECT session_id, domain FROM session_domains WHERE session_id IN ({placeholders})",
+                    ids,
+                ):
+                    domains.setdefault(session_id, []).append(d)
+
+        return {
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "items": [
+                {
+                    "session_id": r[0],
+                    "timestamp": r[1],
+                    "context_hash": r[2],
+                    "confidence_score": r[3],
+                    "factor_count": r[4],
+                    "narrative_preview": r[5],
+                    "domains": sorted(domains.get(r[0], [])),
+                }
+                for r in rows
+            ],
+        }
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def session_store_from_env(logs_dir: Path) -> SessionStore:
+    path = os.getenv("SESSION_DB_PATH", "").strip()
+    return SessionStore(Path(path) if path else logs_dir / "sessions.sqlite3")
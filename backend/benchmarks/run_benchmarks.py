@@ -0,0 +1,398 @@
+"""Offline performance benchmarks for the AETHER backend.
+
+Runs against the deterministic fake LLM backend (LLM_PROVIDER=fake), so no
+network or credentials are needed. Suites:
+
+  pdf           pdf_parser in-process (serially: pdfium is not thread-safe) and via
+                the PDF worker pool at every concurrency level
+  orchestrator  AetherOrchestrator.analyze on contexts built from the sample PDFs, with the
+                share of support prompt tokens served from the context cache
+  api           /analyze and /analyze-pdf through the FastAPI app (in-process ASGI)
+  startup       cold start in fresh interpreters: `import app.main`, then app startup
+                and the first / and /status responses (checked against --startup-budget)
+
+Each suite reports throughput, p50/p95/p99 latency, errors and memory for every
+concurrency level. The exit code is 1 if any request failed, a regression beyond
+--tolerance was found, or startup exceeded its budget. Run from backend/:
+
+  python -m benchmarks.run_benchmarks --suite all --concurrency 1,4,8 --requests 16
+  python -m benchmarks.run_benchmarks --json out.json --baseline previous.json
+  python -m benchmarks.run_benchmarks --suite startup --startup-budget 1.0
+  python -m benchmarks.run_benchmarks --suite orchestrator --prefer-context-cache
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SAMPLE_PDFS = ("messy_report_with_tables.pdf", "AETHER_Report_Tables.pdf")
+
+
+def _configure_env(args: argparse.Namespace, logs_dir: str) -> None:
+    # Must run before any app module is imported: clients and caches read env at construction
+    os.environ.update({
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_LATENCY_MS": str(args.latency_ms),
+        "FAKE_LLM_LATENCY_SIGMA": str(args.latency_sigma),
+        "FAKE_LLM_FAILURE_RATE": str(args.failure_rate),
+        "FAKE_LLM_RATE_LIMIT_RATE": str(args.rate_limit_rate),
+        "FAKE_LLM_SEED": str(args.seed),
+        "LLM_REQUESTS_PER_MINUTE": str(args.rpm),
+        "LLM_TOKENS_PER_MINUTE": str(10 ** 9),
+        "LLM_BACKOFF_BASE": "0.05",
+        "LLM_BACKOFF_MAX": "0.5",
+        "LLM_CACHE_PATH": "",
+        "GEMINI_CONTEXT_CACHE": "false" if args.no_context_cache else "true",
+        "CONTEXT_RETRIEVAL_PREFER_CACHE": "true" if args.prefer_context_cache else "false",
+        "AETHER_LOGS_DIR": logs_dir,
+    })
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index] * 1000, 1)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def _run_load(
+    task: Callable[[int], Awaitable[Any]], requests: int, concurrency: int
+) -> Tuple[List[float], float, int]:
+    """Run `requests` calls of task(i) with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await task(i)
+            except Exception as exc:
+                errors += 1
+                print(f"  request {i} failed: {exc!r}"[:200])
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, time.perf_counter() - started, errors
+
+
+async def _measure(
+    name: str, task: Callable[[int], Awaitable[Any]], requests: int, concurrency: int, trace_memory: bool
+) -> Dict[str, Any]:
+    if trace_memory:
+        tracemalloc.reset_peak()
+    latencies, wall, errors = await _run_load(task, requests, concurrency)
+    result = {
+        "benchmark": name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+    if trace_memory:
+        result["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+    print(
+        f"{name:<22} c={concurrency:<3} n={requests:<4} err={errors:<3} "
+        f"{result['throughput_rps']:>8.2f} req/s  p50={result['p50_ms']:>8.1f}ms  "
+        f"p95={result['p95_ms']:>8.1f}ms  p99={result['p99_ms']:>8.1f}ms  rss={result['peak_rss_mb']}MB"
+    )
+    return result
+
+
+def _levels(args: argparse.Namespace) -> List[int]:
+    return [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+
+def _load_pdfs() -> List[bytes]:
+    return [(BACKEND_DIR / name).read_bytes() for name in SAMPLE_PDFS]
+
+
+# -- suites ------------------------------------------------------------------
+
+
+async def bench_pdf(args: argparse.Namespace, concurrency: int, pdfs: List[bytes]) -> List[Dict[str, Any]]:
+    from app.utils import pdf_parser, pdf_pool
+
+    async def in_process(i: int) -> Any:
+        return await asyncio.to_thread(pdf_parser.extract_metadata_and_text, pdfs[i % len(pdfs)])
+
+    async def pooled(i: int) -> Any:
+        return await pdf_pool.parse_pdf(pdfs[i % len(pdfs)])
+
+    results = []
+    if concurrency == _levels(args)[0]:
+        # Camelot renders through pdfium, which crashes when two threads render at once, so
+        # the single-process baseline runs one document at a time (and once, not per level)
+        pdf_parser.load_table_stack()
+        results.append(await _measure("pdf_parser", in_process, args.requests, 1, args.trace_memory))
+    await pdf_pool.warm_up()
+    results.append(await _measure("pdf_pool", pooled, args.requests, concurrency, args.trace_memory))
+    return results
+
+
+def _support_tokens() -> Tuple[float, float]:
+    from app.utils.metrics import get_metrics
+
+    metrics = get_metrics()
+    return (
+        metrics.value("aether_llm_tokens_total", agent="support", kind="prompt"),
+        metrics.value("aether_llm_tokens_total", agent="support", kind="cached"),
+    )
+
+
+async def bench_orchestrator(args: argparse.Namespace, concurrency: int, pdfs: List[bytes]) -> List[Dict[str, Any]]:
+    from app.orchestrator import AetherOrchestrator
+    from app.schemas.context import ReasoningContext
+    from app.utils.llm_cache import cache_enabled
+    from app.utils.pdf_parser import extract_metadata_and_text
+
+    orchestrator = AetherOrchestrator()
+    documents = [extract_metadata_and_text(data) for data in pdfs]
+
+    async def analyze(i: int) -> Any:
+        cache_enabled.set(args.cache)
+        doc = documents[i % len(documents)]
+        # A unique suffix keeps each request distinct so LLM cache keys never collide across requests
+        context = ReasoningContext(narrative=f"{doc['text']}\n(run {i})", metrics=doc["metrics"])
+        return await orchestrator.analyze(context)
+
+    await orchestrator.reasoning_logger.start()
+    try:
+        prompt_before, cached_before = _support_tokens()
+        result = await _measure("orchestrator.analyze", analyze, args.requests, concurrency, args.trace_memory)
+        prompt_after, cached_after = _support_tokens()
+        prompt, cached = prompt_after - prompt_before, cached_after - cached_before
+        result["support_cached_share"] = round(cached / prompt, 3) if prompt else 0.0
+        print(f"{'':<22} support prompt tokens {prompt:.0f}, {result['support_cached_share']:.0%} context-cached")
+        return [result]
+    finally:
+        await orchestrator.reasoning_logger.stop()
+
+
+async def bench_api(args: argparse.Namespace, concurrency: int, pdfs: List[bytes]) -> List[Dict[str, Any]]:
+    import httpx
+
+    from app import main
+
+    params = {} if args.cache else {"no_cache": "true"}
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+
+            async def analyze(i: int) -> Any:
+                r = await client.post(
+                    "/analyze", params=params, json={"narrative": f"Regional sales grew in run {i}."}
+                )
+                r.raise_for_status()
+
+            async def analyze_pdf(i: int) -> Any:
+                files = {"file": (f"bench-{i}.pdf", pdfs[i % len(pdfs)], "application/pdf")}
+                r = await client.post("/analyze-pdf", params=params, files=files)
+                r.raise_for_status()
+
+            return [
+                await _measure("POST /analyze", analyze, args.requests, concurrency, args.trace_memory),
+                await _measure("POST /analyze-pdf", analyze_pdf, args.requests, concurrency, args.trace_memory),
+            ]
+
+
+# Runs in a fresh interpreter; the httpx import is harness cost, so it happens before the clock starts
+_STARTUP_PROBE = """
+import asyncio, json, time
+import httpx
+started = time.perf_counter()
+import app.main as main
+imported = time.perf_counter()
+
+async def probe():
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in ("/", "/status"):
+                (await client.get(path)).raise_for_status()
+            return time.perf_counter()
+
+ready = asyncio.run(probe())
+print(json.dumps({"import": imported - started, "ready": ready - started}))
+"""
+
+
+def _startup_sample() -> Dict[str, float]:
+    # Measure the production provider: the Gemini client must not be built at startup
+    env = {**os.environ, "LLM_PROVIDER": "gemini"}
+    out = subprocess.run(
+        [sys.executable, "-c", _STARTUP_PROBE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+async def bench_startup(args: argparse.Namespace, concurrency: int, pdfs: List[bytes]) -> List[Dict[str, Any]]:
+    samples = []
+    for _ in range(args.requests):
+        samples.append(await asyncio.to_thread(_startup_sample))
+    results = []
+    for phase in ("import", "ready"):
+        seconds = [s[phase] for s in samples]
+        result = {
+            "benchmark": f"startup.{phase}",
+            "concurrency": 1,
+            "requests": len(seconds),
+            "errors": 0,
+            "wall_seconds": round(sum(seconds), 3),
+            "throughput_rps": round(len(seconds) / sum(seconds), 2),
+            "p50_ms": _percentile(seconds, 50),
+            "p95_ms": _percentile(seconds, 95),
+            "p99_ms": _percentile(seconds, 99),
+            "peak_rss_mb": None,
+        }
+        print(
+            f"{result['benchmark']:<22} n={len(seconds):<4} p50={result['p50_ms']:>8.1f}ms  "
+            f"p95={result['p95_ms']:>8.1f}ms  max={max(seconds) * 1000:>8.1f}ms"
+        )
+        results.append(result)
+    return results
+
+
+SUITES = {"pdf": bench_pdf, "orchestrator": bench_orchestrator, "api": bench_api, "startup": bench_startup}
+
+
+# -- regression check ----------------------------------------------------------
+
+
+def _compare(results: List[Dict[str, Any]], baseline_path: Path, tolerance: float) -> List[str]:
+    """Flag runs whose p95 grew or throughput dropped by more than `tolerance` vs the baseline."""
+    baseline = {
+        (r["benchmark"], r["concurrency"]): r
+        for r in json.loads(baseline_path.read_text(encoding="utf-8"))["results"]
+    }
+    regressions = []
+    for r in results:
+        before = baseline.get((r["benchmark"], r["concurrency"]))
+        if before is None:
+            continue
+        if before["p95_ms"] and r["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{r['benchmark']} c={r['concurrency']}: p95 {before['p95_ms']} → {r['p95_ms']} ms")
+        if r["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{r['benchmark']} c={r['concurrency']}: throughput {before['throughput_rps']} → {r['throughput_rps']} req/s"
+            )
+    return regressions
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline AETHER benchmarks (fake LLM backend)")
+    parser.add_argument("--suite", choices=[*SUITES, "all"], default="all")
+    parser.add_argument("--concurrency", default="1,4", help="comma-separated levels, e.g. 1,4,8")
+    parser.add_argument("--requests", type=int, default=8, help="requests per benchmark and level")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="median fake LLM latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="log-normal spread of fake latency")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of fake calls failing with 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of fake calls failing with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rpm", type=int, default=100000, help="LLM requests-per-minute budget")
+    parser.add_argument("--cache", action="store_true", help="leave LLM/result caches enabled")
+    parser.add_argument(
+        "--no-context-cache", action="store_true",
+        help="disable context caching of shared prompt prefixes (GEMINI_CONTEXT_CACHE=false)",
+    )
+    parser.add_argument(
+        "--prefer-context-cache", action="store_true",
+        help="share one cacheable support view instead of per-factor retrieval (CONTEXT_RETRIEVAL_PREFER_CACHE=true)",
+    )
+    parser.add_argument("--trace-memory", action="store_true", help="track Python heap peak (slower)")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="previous --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression vs baseline")
+    parser.add_argument(
+        "--startup-budget", type=float, default=float(os.getenv("STARTUP_BUDGET_SECONDS", "1.0")),
+        help="max p95 seconds from import to serving / and /status (startup suite)",
+    )
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    pdfs = _load_pdfs()
+    levels = _levels(args)
+    suites = list(SUITES) if args.suite == "all" else [args.suite]
+    if args.trace_memory:
+        tracemalloc.start()
+
+    results: List[Dict[str, Any]] = []
+    for suite in suites:
+        # Cold starts are sequential; one pass regardless of concurrency levels
+        for concurrency in levels if suite != "startup" else levels[:1]:
+            results.extend(await SUITES[suite](args, concurrency, pdfs))
+
+    over_budget = [
+        r for r in results if r["benchmark"] == "startup.ready" and r["p95_ms"] > args.startup_budget * 1000
+    ]
+    for r in over_budget:
+        print(f"BUDGET startup p95 {r['p95_ms']} ms exceeds {args.startup_budget * 1000:.0f} ms")
+    failed = [r for r in results if r["errors"]]
+    for r in failed:
+        print(f"ERRORS {r['benchmark']} c={r['concurrency']}: {r['errors']}/{r['requests']} requests failed")
+
+    if args.json:
+        settings = {k: str(v) if isinstance(v, Path) else v for k, v in vars(args).items()}
+        args.json.write_text(json.dumps({"args": settings, "results": results}, indent=2), encoding="utf-8")
+        print(f"\nWrote {args.json}")
+    if args.baseline:
+        regressions = _compare(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.tolerance:.0%} vs {args.baseline}")
+    return 1 if over_budget or failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="aether-bench-") as logs_dir:
+        _configure_env(args, logs_dir)
+        code = asyncio.run(_main(args))
+        from app.utils import pdf_pool
+
+        pdf_pool.shutdown()
+        return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
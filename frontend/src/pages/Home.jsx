@@ -55,7 +55,7 @@ const Home = () => {
     try {
       setLoading(true);
       setStatus(null);
-      const pdfData = await downloadLatestReport();
+      const pdfData = await downloadLatestReport(result?.job_id);
       downloadFile(pdfData.blob, pdfData.filename);
     } catch (err) {
       setError(err.message || "Failed to download PDF");
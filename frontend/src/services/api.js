@@ -76,8 +76,11 @@ export const analyzeContextReport = async (context) => {
   };
 };
 
-export const downloadLatestReport = async () => {
-  const res = await fetch(`${API_BASE}/download-report`);
+export const downloadLatestReport = async (jobId) => {
+  const url = jobId
+    ? `${API_BASE}/download-report/${jobId}`
+    : `${API_BASE}/download-report`;
+  const res = await fetch(url);
 
   if (!res.ok) {
     const detail = await res.text();